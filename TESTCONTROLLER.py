@@ -14,9 +14,12 @@ Requires: pip install paho-mqtt
 """
 
 import json
+import re
 import sys
 import time
+from enum import Enum
 import paho.mqtt.client as mqtt
+from command_latency import CommandLatency
 
 # MQTT Configuration
 BROKER_HOST = "192.168.154.34"
@@ -25,37 +28,128 @@ BROKER_PORT = 1883
 TOPIC_CMDS  = "esp32/control"   # ESP32 subscribes here
 TOPIC_WATCH = "esp32/#"         # Watch all ESP32 responses
 
-# Add a global for a user callback
-rfid_callback = None
-coin_callback = None
-touch_callback = None
-proximity_callback = None
-led_callback = None
-ultrasonic_callback = None
+# Faster JSON decoder when available; both accept the raw payload bytes
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+class LedColor(str, Enum):
+    """Colours the LED board reports; `.value` is the plain name"""
+    Red = "Red"
+    Yellow = "Yellow"
+    Blue = "Blue"
+    Green = "Green"
+    Orange = "Orange"
+    Black = "Black"
+
+
+_COIN_INSERTED = {1, "1", True, "INSERTED", "detected"}
+_LED_COLORS = re.compile(r"Color \d+:\s*(\w+)")
+_LED_BY_NAME = {color.value: color for color in LedColor}
+
+
+def parse_coin(packet):
+    """True if the COIN packet reports an actual insertion"""
+    data = packet.get("data")
+    try:
+        return data in _COIN_INSERTED
+    except TypeError:  # Unhashable data (list/dict) is never an insertion
+        return False
+
+
+def parse_proximity(packet):
+    """Parse "sensor:state" into (sensor, state) ints"""
+    sensor, state = packet["data"].split(":")
+    return int(sensor), int(state)
+
+
+def parse_led(packet):
+    """Parse "Color 1: Blue, Color 2: ..." into LedColor members; None for other LED messages (animation logs).
+
+    A colour name the enum does not know yet is passed through as the plain
+    string, so a firmware rename does not drop the whole packet.
+    """
+    names = _LED_COLORS.findall(packet["data"])
+    if len(names) < 3:
+        return None
+    return [_LED_BY_NAME.get(name, name) for name in names]
+
+
+def parse_touch(packet):
+    return int(packet["data"])
+
+
+def parse_data(packet):
+    return packet["data"]
+
+
+def parse_packet(packet):
+    return packet
+
+
+# Packet type -> parser run once per packet, before any subscriber sees it
+PARSERS = {
+    "RFID": parse_data,
+    "COIN": parse_coin,
+    "TOUCH": parse_touch,
+    "PROXIMITY": parse_proximity,
+    "LED": parse_led,
+    "ULTRASONIC": parse_packet,
+    "LOG": parse_data,
+    "SERVO": parse_data,
+}
+
+# Packet type -> subscribers, each called with the parsed value
+_handlers = {}
+_legacy_handlers = {}  # Packet type -> the handler installed by a set_*_callback function
+stats = {"messages": 0, "errors": 0}
+
+# Command -> response round trips; query with command_latency.summary()
+command_latency = CommandLatency()
+
+
+def subscribe(typ, handler):
+    """Call `handler(parsed)` for every packet of `typ`; several handlers per type are allowed"""
+    _handlers.setdefault(typ, []).append(handler)
+    return handler
+
+
+def unsubscribe(typ, handler):
+    handlers = _handlers.get(typ, [])
+    if handler in handlers:
+        handlers.remove(handler)
+
+
+def _set_callback(typ, handler):
+    """Replace the set_*_callback subscriber for a type, as the single-callback API did"""
+    previous = _legacy_handlers.pop(typ, None)
+    if previous is not None:
+        unsubscribe(typ, previous)
+    if handler is not None:
+        _legacy_handlers[typ] = subscribe(typ, handler)
+
 
 def set_rfid_callback(cb):
-    global rfid_callback
-    rfid_callback = cb
+    _set_callback("RFID", cb)
 
 def set_coin_callback(cb):
-    global coin_callback
-    coin_callback = cb
+    # Coin subscribers get the insertion flag; the legacy callback only fires on a real insertion
+    _set_callback("COIN", (lambda inserted: cb() if inserted else None) if cb else None)
 
 def set_touch_callback(cb):
-    global touch_callback
-    touch_callback = cb
+    _set_callback("TOUCH", cb)
 
 def set_proximity_callback(cb):
-    global proximity_callback
-    proximity_callback = cb
+    _set_callback("PROXIMITY", cb)
 
 def set_led_callback(cb):
-    global led_callback
-    led_callback = cb
+    _set_callback("LED", cb)
 
 def set_ultrasonic_callback(cb):
-    global ultrasonic_callback
-    ultrasonic_callback = cb
+    _set_callback("ULTRASONIC", cb)
 
 # MQTT Callbacks
 def on_connect(client, _userdata, _flags, rc, _props=None):
@@ -65,63 +159,44 @@ def on_connect(client, _userdata, _flags, rc, _props=None):
     else:
         print(f"[MQTT] Connection failed (rc={rc})")
 
+def dispatch(packet):
+    """Parse a decoded packet once and hand it to every subscriber of its type"""
+    typ = packet.get("type", "RAW")
+    parser = PARSERS.get(typ)
+    handlers = _handlers.get(typ)
+    try:
+        value = parser(packet) if parser else packet
+    except Exception as e:
+        stats["errors"] += 1
+        print(f"[{typ}]  Unparsable packet ({e}): {packet}")
+        return
+    print(f"[{typ}]  {packet.get('data', packet)}")
+    command_latency.on_packet(typ, value)
+    if not handlers:
+        return
+    for handler in list(handlers):
+        try:
+            handler(value)
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"[{typ} Error] Handler failed: {e}")
+
 def on_message(_client, _userdata, msg):
+    stats["messages"] += 1
     try:
-        payload = msg.payload.decode()
-        packet = json.loads(payload)
-        typ = packet.get("type", "RAW")
-        if   typ == "LOG":      print(f"[LOG]    {packet['data']}")
-        elif typ == "RFID":
-            print(f"[RFID]   UID: {packet['data']}")
-            if rfid_callback:
-                rfid_callback(packet['data'])
-        elif typ == "COIN":
-            print(f"[COIN]   Raw packet: {packet}")
-            print(f"[COIN]   Data: {packet['data']}")
-            print(f"[COIN]   Data type: {type(packet['data'])}")
-            
-            # Only trigger callback if coin was actually inserted (data should indicate insertion)
-            coin_inserted = False
-            try:
-                # Handle different possible data formats
-                coin_data = packet['data']
-                if coin_data == 1 or coin_data == "1" or coin_data is True or coin_data == "INSERTED" or coin_data == "detected":
-                    coin_inserted = True
-                    print(f"[COIN]   ✅ Valid coin insertion detected: {coin_data}")
-                else:
-                    print(f"[COIN]   ❌ Invalid coin data (not insertion): {coin_data}")
-            except:
-                print(f"[COIN]   ❌ Error parsing coin data: {packet.get('data', 'NO_DATA')}")
-            
-            if coin_inserted and coin_callback:
-                print(f"[COIN]   🪙 Triggering coin callback")
-                coin_callback()
-            elif coin_callback:
-                print(f"[COIN]   🚫 Coin callback NOT triggered - invalid data")
-        elif typ == "TOUCH":
-            print(f"[TOUCH]  Sensor index: {packet['data']}")
-            if touch_callback:
-                touch_callback(packet['data'])
-        elif typ == "PROXIMITY":
-            print(f"[PROXIMITY]  {packet}")
-            if proximity_callback:
-                proximity_callback(packet['data'])
-        elif typ == "LED":      
-            print(f"[LED]    {packet['data']}")
-            if led_callback:
-                led_callback(packet['data'])
-        elif typ == "ULTRASONIC":
-            print(f"[ULTRASONIC]  {packet}")
-            if ultrasonic_callback:
-                ultrasonic_callback(packet)
-        elif typ == "SERVO":    print(f"[SERVO]  {packet['data']}")
-        else:                   print(f"[{typ}]  {packet}")
-    except Exception:
-        print(f"[{msg.topic}] {msg.payload.decode()}")
+        packet = _loads(msg.payload)
+    except ValueError:
+        print(f"[{msg.topic}] {msg.payload.decode(errors='replace')}")
+        return
+    if isinstance(packet, dict):
+        dispatch(packet)
+    else:
+        print(f"[{msg.topic}] {packet}")
 
 # Send MQTT Command
 def send_status_cmd(client, cmd: str, topic_override=None):
-    payload = json.dumps({"status": cmd})
+    # The id is only for our latency spans (opened by MqttLink on publish); the boards just read "status"
+    payload = json.dumps({"status": cmd, "id": command_latency.next_id()})
     topic = topic_override if topic_override else TOPIC_CMDS
     client.publish(topic, payload, qos=1)
     print(f"[? CMD] {payload} to {topic}")
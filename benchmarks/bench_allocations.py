@@ -0,0 +1,58 @@
+"""Measure per-frame memory allocations of the ball detector in steady state.
+
+Run from the repository root:
+    python -m benchmarks.bench_allocations [--frames 60] [--engine watershed]
+
+numpy and OpenCV output arrays are allocated through numpy, so tracemalloc sees
+them. After a warm-up the detector should only allocate small Python objects
+(contours, result tuples), not frame-sized arrays.
+"""
+import argparse
+import tracemalloc
+from vision.ball_detector import BallDetector
+from vision.disc_roi import DiscROI
+from benchmarks import synthetic
+
+
+def measure(detector, frames, roi):
+    """Average and worst peak bytes allocated during one detect() call"""
+    peaks = []
+    for frame, _ in frames:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        detector.detect(frame, None, roi)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    return sum(peaks) / len(peaks), max(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--engine", default="watershed")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+
+    frame_size = (synthetic.FRAME_WIDTH, synthetic.FRAME_HEIGHT)
+    roi = DiscROI(synthetic.DISC_CENTER, synthetic.ROI_RADIUS, frame_size)
+    frames = synthetic.make_frames(args.frames)
+    region_kb = roi.size[0] * roi.size[1] * 3 / 1024
+
+    tracemalloc.start()
+    print(f"ROI region: {roi.size[0]}x{roi.size[1]} ({region_kb:.0f} KB as RGB)")
+    print(f"{'mode':<8}{'avg KB/frame':>14}{'max KB/frame':>14}{'buffer allocs':>15}")
+    for scale in args.scales:
+        detector = BallDetector(synthetic.LOWER_BALL, synthetic.UPPER_BALL, scale=scale, engine=args.engine)
+        measure(detector, frames[:3], roi)  # Warm-up sizes every buffer
+        warm = detector.buffer_stats()
+        avg, worst = measure(detector, frames, roi)
+        stats = detector.buffer_stats()
+        steady = (stats['detector']['allocations'] - warm['detector']['allocations']
+                  + stats['engine']['allocations'] - warm['engine']['allocations'])
+        mode = 'full' if scale == 1 else f"1/{scale}"
+        print(f"{mode:<8}{avg / 1024:>14.1f}{worst / 1024:>14.1f}{steady:>15}")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Messages/second through the MQTT packet dispatcher, before and after the handler table.
+
+Run from the repository root:
+    python -m benchmarks.bench_dispatch [--messages 20000]
+
+Console output of both paths goes to os.devnull, so the print cost is
+counted but does not flood the terminal.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+import TESTCONTROLLER
+
+PACKETS = [
+    {"type": "PROXIMITY", "data": "2:1"},
+    {"type": "PROXIMITY", "data": "2:0"},
+    {"type": "COIN", "data": 1},
+    {"type": "TOUCH", "data": "3"},
+    {"type": "LED", "data": "Color 1: Blue, Color 2: Black, Color 3: Orange"},
+    {"type": "LOG", "data": "heartbeat"},
+]
+
+
+class Message:
+    def __init__(self, packet):
+        self.topic = "esp32/esp1"
+        self.payload = json.dumps(packet).encode()
+
+
+def legacy_on_message(callbacks, msg):
+    """The previous if/elif dispatcher, kept as the baseline"""
+    try:
+        payload = msg.payload.decode()
+        packet = json.loads(payload)
+        typ = packet.get("type", "RAW")
+        if typ == "LOG":
+            print(f"[LOG]    {packet['data']}")
+        elif typ == "COIN":
+            print(f"[COIN]   Raw packet: {packet}")
+            print(f"[COIN]   Data: {packet['data']}")
+            print(f"[COIN]   Data type: {type(packet['data'])}")
+            coin_data = packet['data']
+            coin_inserted = coin_data == 1 or coin_data == "1" or coin_data is True \
+                or coin_data == "INSERTED" or coin_data == "detected"
+            print(f"[COIN]   Valid coin insertion detected: {coin_data}")
+            if coin_inserted and callbacks.get("COIN"):
+                print("[COIN]   Triggering coin callback")
+                callbacks["COIN"]()
+        elif typ in ("TOUCH", "PROXIMITY", "LED"):
+            print(f"[{typ}]  {packet}")
+            if callbacks.get(typ):
+                callbacks[typ](packet['data'])
+        else:
+            print(f"[{typ}]  {packet}")
+    except Exception:
+        print(f"[{msg.topic}] {msg.payload.decode()}")
+
+
+def legacy_callbacks():
+    """Handlers doing the parsing the old main.py did on the raw strings"""
+    def on_proximity(data):
+        sensor, state = data.split(":")
+
+    def on_led(data):
+        parts = data.split(", ")
+        [part.split(": ")[1].strip() for part in parts]
+
+    return {"COIN": lambda: None, "TOUCH": lambda data: int(data), "PROXIMITY": on_proximity, "LED": on_led}
+
+
+def rate(handle, messages):
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        for msg in messages:
+            handle(msg)
+        elapsed = time.perf_counter() - start
+    return len(messages) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    messages = [Message(PACKETS[i % len(PACKETS)]) for i in range(args.messages)]
+
+    callbacks = legacy_callbacks()
+    before = rate(lambda msg: legacy_on_message(callbacks, msg), messages)
+
+    for typ in ("COIN", "TOUCH", "PROXIMITY", "LED"):
+        TESTCONTROLLER.subscribe(typ, lambda value: None)
+    after = rate(lambda msg: TESTCONTROLLER.on_message(None, None, msg), messages)
+
+    print(f"JSON decoder: {TESTCONTROLLER._loads.__module__}")
+    print(f"{'dispatcher':<12}{'msg/s':>12}")
+    print(f"{'if/elif':<12}{before:>12.0f}")
+    print(f"{'table':<12}{after:>12.0f}  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare Cartesian and polar-unwrapped ball detection.
+
+Run from the repository root:
+    python -m benchmarks.bench_polar [--frames 60] [--angle-bins 360] [--radius-bins 200 100]
+"""
+import argparse
+import time
+from vision.ball_detector import BallDetector
+from vision.disc_roi import DiscROI
+from vision.sector_map import SectorMap, UNKNOWN_SECTOR
+from benchmarks import synthetic
+
+
+def sector_names(sector_map, balls):
+    return sorted(sector_map.label_at(center) for center, _ in balls)
+
+
+def code_names(codes):
+    names = [label for label, _, _ in synthetic.SECTORS]
+    return sorted(names[code] if code != UNKNOWN_SECTOR else "Unknown" for code in codes)
+
+
+def run(detector, frames, roi):
+    results = []
+    codes = []
+    start = time.perf_counter()
+    for frame, _ in frames:
+        results.append(detector.detect(frame, None, roi))
+        codes.append(detector.last_codes)
+    elapsed = time.perf_counter() - start
+    return results, codes, elapsed * 1000 / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--angle-bins", type=int, default=360)
+    parser.add_argument("--radius-bins", type=int, nargs="+", default=[200, 100])
+    args = parser.parse_args()
+
+    frame_size = (synthetic.FRAME_WIDTH, synthetic.FRAME_HEIGHT)
+    roi = DiscROI(synthetic.DISC_CENTER, synthetic.ROI_RADIUS, frame_size)
+    sector_map = SectorMap(synthetic.DISC_CENTER, synthetic.SECTORS, frame_size)
+    frames = synthetic.make_frames(args.frames)
+    truth = [sorted(sector_map.label_at((x, y)) for x, y, _ in balls) for _, balls in frames]
+
+    baseline = BallDetector(synthetic.LOWER_BALL, synthetic.UPPER_BALL)
+    run(baseline, frames[:3], roi)  # Warm-up
+    base_results, _, base_ms = run(baseline, frames, roi)
+    base_sectors = [sector_names(sector_map, balls) for balls in base_results]
+    base_truth = sum(a == b for a, b in zip(base_sectors, truth)) / len(frames)
+    print(f"{'mode':<16}{'pixels':>8}{'ms/frame':>10}{'speedup':>10}{'agree w/ cart':>15}{'agree w/ truth':>16}")
+    print(f"{'cartesian':<16}{roi.size[0] * roi.size[1]:>8}{base_ms:>10.2f}{1.0:>10.2f}"
+          f"{1.0:>15.1%}{base_truth:>16.1%}")
+
+    for radius_bins in args.radius_bins:
+        detector = BallDetector(synthetic.LOWER_BALL, synthetic.UPPER_BALL)
+        detector.set_polar({'angle_bins': args.angle_bins, 'radius_bins': radius_bins}, synthetic.SECTORS)
+        run(detector, frames[:3], roi)
+        _, codes, ms = run(detector, frames, roi)
+        # Sectors straight from the polar columns, no sector map lookup
+        sectors = [code_names(frame_codes) for frame_codes in codes]
+        agree = sum(a == b for a, b in zip(sectors, base_sectors)) / len(frames)
+        agree_truth = sum(a == b for a, b in zip(sectors, truth)) / len(frames)
+        pixels = detector.polar.shape[0] * detector.polar.shape[1]
+        print(f"{f'polar {args.angle_bins}x{radius_bins}':<16}{pixels:>8}{ms:>10.2f}{base_ms / ms:>10.2f}"
+              f"{agree:>15.1%}{agree_truth:>16.1%}")
+
+
+if __name__ == "__main__":
+    main()
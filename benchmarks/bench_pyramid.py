@@ -0,0 +1,58 @@
+"""Compare full-resolution and coarse-to-fine ball detection.
+
+Run from the repository root:
+    python -m benchmarks.bench_pyramid [--frames 60] [--scales 2 4]
+"""
+import argparse
+import time
+from vision.ball_detector import BallDetector
+from vision.disc_roi import DiscROI
+from vision.sector_map import SectorMap
+from benchmarks import synthetic
+
+
+def sector_names(sector_map, balls):
+    return sorted(sector_map.label_at(center) for center, _ in balls)
+
+
+def run(detector, frames, roi):
+    results = []
+    start = time.perf_counter()
+    for frame, _ in frames:
+        results.append(detector.detect(frame, None, roi))
+    elapsed = time.perf_counter() - start
+    return results, elapsed * 1000 / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--scales", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    frame_size = (synthetic.FRAME_WIDTH, synthetic.FRAME_HEIGHT)
+    roi = DiscROI(synthetic.DISC_CENTER, synthetic.ROI_RADIUS, frame_size)
+    sector_map = SectorMap(synthetic.DISC_CENTER, synthetic.SECTORS, frame_size)
+    frames = synthetic.make_frames(args.frames)
+    truth = [sorted(sector_map.label_at((x, y)) for x, y, _ in balls) for _, balls in frames]
+
+    baseline = BallDetector(synthetic.LOWER_BALL, synthetic.UPPER_BALL)
+    run(baseline, frames[:3], roi)  # Warm-up
+    base_results, base_ms = run(baseline, frames, roi)
+    base_sectors = [sector_names(sector_map, balls) for balls in base_results]
+    base_truth = sum(a == b for a, b in zip(base_sectors, truth)) / len(frames)
+    print(f"{'mode':<12}{'ms/frame':>10}{'speedup':>10}{'agree w/ full':>15}{'agree w/ truth':>16}")
+    print(f"{'full':<12}{base_ms:>10.2f}{1.0:>10.2f}{1.0:>15.1%}{base_truth:>16.1%}")
+
+    for scale in args.scales:
+        detector = BallDetector(synthetic.LOWER_BALL, synthetic.UPPER_BALL, scale=scale)
+        run(detector, frames[:3], roi)
+        results, ms = run(detector, frames, roi)
+        sectors = [sector_names(sector_map, balls) for balls in results]
+        agree = sum(a == b for a, b in zip(sectors, base_sectors)) / len(frames)
+        agree_truth = sum(a == b for a, b in zip(sectors, truth)) / len(frames)
+        print(f"{'1/' + str(scale):<12}{ms:>10.2f}{base_ms / ms:>10.2f}{agree:>15.1%}{agree_truth:>16.1%}")
+
+
+if __name__ == "__main__":
+    main()
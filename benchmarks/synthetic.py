@@ -0,0 +1,72 @@
+"""Synthetic disc frames for the vision benchmarks (no camera needed).
+
+Calibration values mirror the defaults in screens/gameplay.py.
+"""
+import math
+import numpy as np
+import cv2
+
+FRAME_WIDTH, FRAME_HEIGHT = 1280, 960
+DISC_CENTER = (615, 430)
+ROI_RADIUS = 400
+SECTORS = [
+    ("Red",    -35,  23),
+    ("Yellow", 25, 80),
+    ("Blue", 82, 145),
+    ("Green",147, 202),
+    ("Orange",205, 263),
+    ("Black",265, 324)
+]
+LOWER_BALL = np.array([139, 155, 221])
+UPPER_BALL = np.array([153, 236, 255])
+BALL_HSV = (146, 200, 240)  # Middle of the ball threshold range
+
+
+def random_balls(rng, count=3, min_dist=60, max_dist=330, touching=False):
+    """Random (x, y, radius) balls on the disc; `touching` puts the second ball against the first"""
+    balls = []
+    while len(balls) < count:
+        radius = int(rng.integers(18, 30))
+        if touching and len(balls) == 1:
+            x0, y0, r0 = balls[0]
+            a = rng.uniform(0, 2 * math.pi)
+            x = int(x0 + (r0 + radius - 2) * math.cos(a))
+            y = int(y0 + (r0 + radius - 2) * math.sin(a))
+        else:
+            a = rng.uniform(0, 2 * math.pi)
+            d = rng.uniform(min_dist, max_dist)
+            x = int(DISC_CENTER[0] + d * math.cos(a))
+            y = int(DISC_CENTER[1] + d * math.sin(a))
+            if any(math.hypot(x - bx, y - by) < radius + br + 4 for bx, by, br in balls):
+                continue
+        balls.append((x, y, radius))
+    return balls
+
+
+def render_frame(balls, rng):
+    """RGB888-style frame with a noisy disc background and the given balls"""
+    hsv = np.empty((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8)
+    hsv[...] = (60, 80, 90)
+    hsv += rng.integers(0, 12, hsv.shape, dtype=np.uint8)
+    for label_index in range(len(SECTORS)):
+        # Faint wedge tint so the background is not uniform
+        start = math.radians(SECTORS[label_index][1])
+        end = math.radians(SECTORS[label_index][2])
+        pts = [DISC_CENTER]
+        for k in range(9):
+            a = start + (end - start) * k / 8
+            pts.append((int(DISC_CENTER[0] + 420 * math.cos(a)), int(DISC_CENTER[1] - 420 * math.sin(a))))
+        cv2.fillPoly(hsv, [np.array(pts, np.int32)], (20 * label_index + 10, 120, 120))
+    for x, y, radius in balls:
+        cv2.circle(hsv, (x, y), radius, BALL_HSV, -1)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+
+
+def make_frames(count, seed=0, touching_every=4):
+    """List of (frame, balls) pairs; every `touching_every`-th frame has two touching balls"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        balls = random_balls(rng, touching=touching_every and i % touching_every == 0)
+        frames.append((render_frame(balls, rng), balls))
+    return frames
@@ -0,0 +1,172 @@
+"""Round-trip latency of Pi -> ESP32 commands, matched against the packets they trigger."""
+
+import bisect
+import json
+import threading
+import time
+from collections import deque
+
+# Command -> (response packet type, timeout in seconds, accepts(parsed value) or None for any packet).
+# Only SERVO_RUN waits on PROXIMITY: GameIntroScreen sends START_PROXIMITY right after it, and two
+# spans on one packet type would split the same ball drop between them.
+RESPONSES = {
+    "START_RFID": ("RFID", 300.0, None),
+    "SERVO_RUN": ("PROXIMITY", 20.0, lambda reading: reading[1] == 1),  # A sensor going active, not idle reports
+    "LED_RUN": ("LED", 20.0, lambda colors: colors is not None),  # The colour result, not animation logs
+    "START_TOUCH": ("TOUCH", 60.0, None),
+    "ULTRA_SCAN": ("ULTRASONIC", 30.0, None),
+}
+
+# Round trips that include a person (bringing an RFID card), reported apart from the board timings
+PLAYER_WAIT = {"START_RFID"}
+
+# Upper bucket edges in ms; the last bucket is open-ended
+BUCKETS_MS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram plus count/mean/max of one command's round trips"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.n = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.n += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q):
+        """Upper edge (ms) of the bucket holding the q-th percentile, capped at the maximum seen"""
+        if not self.n:
+            return None
+        target = q / 100.0 * self.n
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(BUCKETS_MS[index], round(self.max_ms, 1)) if index < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'n': self.n,
+            'timeouts': self.timeouts,
+            'mean_ms': round(self.total_ms / self.n, 1) if self.n else None,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'max_ms': round(self.max_ms, 1),
+            'buckets': {f"<={edge}": count for edge, count in zip(BUCKETS_MS, self.counts)} | {
+                f">{BUCKETS_MS[-1]}": self.counts[-1]}
+        }
+
+
+class CommandLatency:
+    """Open spans for sent commands, closed by the first matching response packet.
+
+    `next_id()` numbers a command when its payload is built. The span opens
+    only when the command goes on the wire: `on_publish()` is MqttLink's
+    publish hook, so time spent in the offline queue is not counted, and a
+    command coalesced away while offline never opens a span. `start()` opens
+    one directly. Commands without an entry in `responses` get no span.
+    `on_packet()` closes the oldest open span waiting for that packet type,
+    so two SERVO_RUNs in a row are matched first-in, first-out. Spans older than
+    their timeout are counted as timeouts instead of latencies. Safe to call
+    from the Tk thread and paho's network thread at once.
+    """
+
+    def __init__(self, responses=RESPONSES, player_wait=PLAYER_WAIT):
+        self.responses = responses
+        self.player_wait = player_wait
+        self.histograms = {}
+        self._open = {}      # response type -> deque of (id, command, sent_at, deadline, accepts)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+        return span_id
+
+    def start(self, cmd, span_id=None, now=None):
+        """Stamp a command going on the wire now; returns its id"""
+        now = time.monotonic() if now is None else now
+        if span_id is None:
+            span_id = self.next_id()
+        with self._lock:
+            expected = self.responses.get(cmd)
+            if expected is not None:
+                typ, timeout, accepts = expected
+                self._expire(now)
+                self._open.setdefault(typ, deque()).append((span_id, cmd, now, now + timeout, accepts))
+        return span_id
+
+    def on_publish(self, topic, payload):
+        """MqttLink publish hook: open the span of a {"status", "id"} command payload"""
+        try:
+            packet = json.loads(payload)
+            cmd, span_id = packet["status"], packet.get("id")
+        except (ValueError, KeyError, TypeError):
+            return
+        self.start(cmd, span_id)
+
+    def on_packet(self, typ, value, now=None):
+        """Close the oldest span this packet answers; returns (command, ms) or None"""
+        spans = self._open.get(typ)
+        if not spans:
+            return None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._expire(now)
+            for span in spans:
+                span_id, cmd, sent_at, _, accepts = span
+                if accepts is None or accepts(value):
+                    spans.remove(span)
+                    ms = (now - sent_at) * 1000
+                    self._histogram(cmd).add(ms)
+                    return cmd, ms
+        return None
+
+    def expire(self, now=None):
+        with self._lock:
+            self._expire(time.monotonic() if now is None else now)
+
+    def _expire(self, now):
+        for spans in self._open.values():
+            while spans and spans[0][3] <= now:
+                self._histogram(spans.popleft()[1]).timeouts += 1
+
+    def _histogram(self, cmd):
+        histogram = self.histograms.get(cmd)
+        if histogram is None:
+            histogram = self.histograms[cmd] = LatencyHistogram()
+        return histogram
+
+    def open_spans(self):
+        return sum(len(spans) for spans in self._open.values())
+
+    def summary(self):
+        """{command: histogram summary} for everything measured so far"""
+        self.expire()
+        with self._lock:
+            return {cmd: dict(histogram.summary(), player_wait=cmd in self.player_wait)
+                    for cmd, histogram in self.histograms.items()}
+
+    def dump(self, path="command_latency.json"):
+        """Print a one-line summary per command and write the full histograms to `path`"""
+        summary = self.summary()
+        for cmd, s in summary.items():
+            note = "  (includes player wait)" if s['player_wait'] else ""
+            print(f"[Command Latency] {cmd:<16} n={s['n']} timeouts={s['timeouts']} "
+                  f"p50<={s['p50_ms']}ms p95<={s['p95_ms']}ms max={s['max_ms']}ms{note}")
+        try:
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
+        except OSError as e:
+            print(f"[Command Latency Error] Could not write {path}: {e}")
+        return summary
@@ -0,0 +1,150 @@
+"""Per-board outbound command scheduling: priorities, de-duplication and start/stop collapsing."""
+
+import time
+from collections import deque
+from TESTCONTROLLER import send_status_cmd
+from mqtt_link import COALESCE_GROUPS
+
+CRITICAL, GAME, COSMETIC = 0, 1, 2
+
+# Anything not listed is GAME priority
+PRIORITIES = {
+    "STOP_PROXIMITY": CRITICAL,
+    "SOLENOID_OFF": CRITICAL,
+    "SOLENOID_ON": CRITICAL,
+    "STOP_COIN": CRITICAL,
+    "BEACON_ON": COSMETIC,
+    "BEACON_OFF": COSMETIC,
+    "NEON_ON": COSMETIC,
+    "NEON_OFF": COSMETIC,
+}
+
+
+class CommandScheduler:
+    """Orders and thins out the commands sent to each ESP32 board.
+
+    `send(board, cmd)` publishes CRITICAL commands immediately. Everything
+    else waits in a per-board, per-priority queue that a Tk `after()` pump
+    drains every `interval_ms`, at most `max_per_tick` commands per board, so
+    game commands always leave before cosmetic ones. Before queuing:
+
+    - a pending command of the same COALESCE_GROUPS pair (or the same command)
+      is dropped, so ULTRA_SCAN followed by ULTRA_STOP collapses to the newest;
+    - a command identical to the last one published for its group within
+      `dedup_window` seconds is dropped (repeated ULTRA_SCANs from screens).
+
+    Both rules only apply to the on/off state commands in COALESCE_GROUPS.
+    One-shot actions such as SERVO_RUN or LED_RUN are always sent, however
+    close together.
+
+    Call from the Tk thread only.
+    """
+
+    def __init__(self, client, root, boards, interval_ms=20, max_per_tick=2, dedup_window=1.0,
+                 priorities=PRIORITIES, rate_window=10.0):
+        self.client = client
+        self.root = root
+        self.boards = dict(boards)  # board name -> topic
+        self.interval_ms = interval_ms
+        self.max_per_tick = max_per_tick
+        self.dedup_window = dedup_window
+        self.priorities = priorities
+        self.rate_window = rate_window
+        self._groups = {cmd: group for group in COALESCE_GROUPS for cmd in group}
+        self._pending = {board: [deque() for _ in range(COSMETIC + 1)] for board in self.boards}
+        self._last_sent = {board: {} for board in self.boards}  # board -> group -> (cmd, time)
+        self._sent_times = deque()
+        self._job = None
+
+        self.published = 0
+        self.deduplicated = 0
+        self.collapsed = 0
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._pump)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def send(self, board, cmd, now=None):
+        """Schedule a command; returns False if it was dropped as redundant"""
+        now = time.monotonic() if now is None else now
+        group = self._groups.get(cmd)
+
+        if group is not None:
+            for queue in self._pending[board]:
+                for pending in [c for c in queue if c in group]:
+                    queue.remove(pending)
+                    if pending == cmd:
+                        self.deduplicated += 1
+                    else:
+                        self.collapsed += 1
+
+            last = self._last_sent[board].get(group)
+            if last is not None and last[0] == cmd and now - last[1] < self.dedup_window:
+                self.deduplicated += 1
+                return False
+
+        priority = self.priorities.get(cmd, GAME)
+        if priority == CRITICAL:
+            self._publish(board, cmd, now)
+        else:
+            self._pending[board][priority].append(cmd)
+        return True
+
+    def _publish(self, board, cmd, now):
+        send_status_cmd(self.client, cmd, topic_override=self.boards[board])
+        group = self._groups.get(cmd)
+        if group is not None:
+            self._last_sent[board][group] = (cmd, now)
+        self._sent_times.append(now)
+        self.published += 1
+
+    def pump(self, now=None):
+        """Publish up to `max_per_tick` pending commands per board, highest priority first"""
+        now = time.monotonic() if now is None else now
+        for board, queues in self._pending.items():
+            budget = self.max_per_tick
+            for queue in queues:
+                while queue and budget:
+                    self._publish(board, queue.popleft(), now)
+                    budget -= 1
+
+    def _pump(self):
+        self._job = self.root.after(self.interval_ms, self._pump)
+        try:
+            self.pump()
+        except Exception as e:
+            print(f"[Command Scheduler Error] {e}")
+
+    def flush(self):
+        """Publish everything still pending, e.g. before shutdown"""
+        now = time.monotonic()
+        for board, queues in self._pending.items():
+            for queue in queues:
+                while queue:
+                    self._publish(board, queue.popleft(), now)
+
+    def depth(self, board=None):
+        """Pending commands for one board, or all boards"""
+        boards = [board] if board is not None else self._pending
+        return sum(len(queue) for name in boards for queue in self._pending[name])
+
+    def publish_rate(self, now=None):
+        """Commands per second over the last `rate_window` seconds"""
+        now = time.monotonic() if now is None else now
+        while self._sent_times and now - self._sent_times[0] > self.rate_window:
+            self._sent_times.popleft()
+        return len(self._sent_times) / self.rate_window
+
+    def stats(self):
+        return {
+            'depth': {board: self.depth(board) for board in self.boards},
+            'rate': round(self.publish_rate(), 2),
+            'published': self.published,
+            'deduplicated': self.deduplicated,
+            'collapsed': self.collapsed
+        }
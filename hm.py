@@ -1,6 +1,7 @@
 from picamera2 import Picamera2
 import cv2
 import numpy as np
+from vision.ring_sampler import RingSampler
 
 # CAMERA SETUP
 picam2 = Picamera2()
@@ -24,14 +25,8 @@ color_regions = {
 
 kernel = np.ones((3, 3), np.uint8)
 
-def ring_average(hsv_img, centre, inner_r, outer_r):
-    mask_ring = np.zeros(hsv_img.shape[:2], dtype=np.uint8)
-    cv2.circle(mask_ring, centre, outer_r, 255, -1)
-    cv2.circle(mask_ring, centre, inner_r,   0,  -1)
-    hsv_vals = hsv_img[mask_ring == 255]
-    if hsv_vals.size == 0:
-        return np.array([0, 0, 0], dtype=np.uint8)
-    return np.mean(hsv_vals, axis=0).astype(np.uint8)
+# Ring colour around each ball, classified against color_regions for all balls at once
+ring_sampler = RingSampler(color_regions)
 
 while True:
     frame = picam2.capture_array()
@@ -54,6 +49,7 @@ while True:
     ws_input = frame.copy()
     cv2.watershed(ws_input, markers)
 
+    balls = []
     for marker_id in range(2, num_markers + 1):
         mask_obj = np.uint8(markers == marker_id)
         area = cv2.countNonZero(mask_obj)
@@ -71,15 +67,11 @@ while True:
 
         cv2.circle(frame, center, radius, (0, 255, 0), 2)
         cv2.circle(frame, center, 3, (0, 0, 255), -1)
+        balls.append((center, radius))
 
-        avg_hsv = ring_average(hsv, center, radius + 2, radius + 5)
-
-        region = "None"
-        for name, (low, up) in color_regions.items():
-            if cv2.inRange(np.uint8([[avg_hsv]]), low, up)[0][0]:
-                region = name
-                break
-
+    rings = [(center, radius + 2, radius + 5) for center, radius in balls]
+    regions, _ = ring_sampler.classify_rings(hsv, rings)
+    for (center, radius), region in zip(balls, regions):
         cv2.putText(frame, f"In: {region}",
                     (center[0] - 30, center[1] + radius + 15),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
@@ -79,13 +79,13 @@ class ArcadeApp(tk.Tk):
         self.proximity_last_state = {}
         def on_proximity(data):
             try:
-                sensor, state = data.split(":")
+                sensor, state = data  # Parsed from "sensor:state" by TESTCONTROLLER
                 if sensor not in self.proximity_last_state:
                     self.proximity_last_state[sensor] = state
                     return
                 last = self.proximity_last_state[sensor]
                 self.proximity_last_state[sensor] = state
-                if last == "1" and state == "0":
+                if last == 1 and state == 0:
                     self.proximity_count += 1
                     if self.proximity_count == 3:
                         if hasattr(self, 'send_esp2_command'):
@@ -7,9 +7,11 @@ from screens.gameplay import GameplayScreen
 from screens.final_screen import FinalScreen
 from screens.end_screen import EndScreen
 from screens.rewards import RewardsScreen
-from TESTCONTROLLER import send_status_cmd, set_rfid_callback, set_coin_callback, set_touch_callback, set_proximity_callback, set_led_callback, set_ultrasonic_callback
-import paho.mqtt.client as mqtt
+from TESTCONTROLLER import command_latency, send_status_cmd, set_rfid_callback, set_coin_callback, set_touch_callback, set_proximity_callback, set_led_callback, set_ultrasonic_callback
+from mqtt_link import MqttLink
+from command_scheduler import CommandScheduler
 from DbSetup import user_exists
+from ui.event_bus import EventBus
 import uuid
 import pygame  # For playing sound
 
@@ -55,14 +57,27 @@ class ArcadeApp(tk.Tk):
         self.tunnel_predictions = []
         self.tunnel_passages = []  # Track actual tunnel passages from proximity sensors
 
-        # Set up MQTT client with a unique client_id to avoid disconnect loops
+        # MQTT callbacks run on paho's network thread; the bus replays them on the Tk thread in batches
+        self.events = EventBus(self, interval_ms=10)
+        self.events.start()
+
+        # Set up MQTT client with a unique client_id to avoid disconnect loops.
+        # Connecting happens in the background, so boot never waits for the broker;
+        # commands sent while offline are queued and flushed on connect.
         unique_id = f"PiControlClient-{uuid.uuid4()}"
-        self.mqtt_client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=unique_id)
         from TESTCONTROLLER import on_connect, on_message
-        self.mqtt_client.on_connect = on_connect
-        self.mqtt_client.on_message = on_message
-        self.mqtt_client.connect("192.168.154.34", 1883, keepalive=60)
-        self.mqtt_client.loop_start()
+        self.mqtt_client = MqttLink("192.168.154.34", 1883, client_id=unique_id, keepalive=60,
+                                    on_connect=on_connect, on_message=on_message,
+                                    on_state=self.events.wrap("MQTT_STATE", self.on_mqtt_state),
+                                    on_publish=command_latency.on_publish)
+        self.mqtt_client.start()
+
+        # Outbound commands: safety first, cosmetic last, repeats and undone start/stop pairs dropped
+        self.commands = CommandScheduler(self.mqtt_client, self, {
+            "esp1": "esp32/control/esp1",
+            "esp2": "esp32/control/esp2"
+        }, interval_ms=20, max_per_tick=2, dedup_window=1.0)
+        self.commands.start()
 
         # Register callback for RFIDCCCCCCCCC
         def on_rfid(uid):
@@ -78,17 +93,15 @@ class ArcadeApp(tk.Tk):
                     add_credit_screen.set_uid(uid)
                 if hasattr(self, 'mqtt_client') and self.mqtt_client:
                     self.send_esp1_command("STOP_RFID")
-                self.after(0, lambda: self.show_frame("AddCreditScreen"))
+                self.show_frame("AddCreditScreen")
             else:
                 self.play_register_first_sound()
-                def show_unregistered():
-                    from tkinter import messagebox
-                    messagebox.showwarning("Unregistered", f"RFID {uid} not registered!")
-                self.after(0, show_unregistered)
+                from tkinter import messagebox
+                messagebox.showwarning("Unregistered", f"RFID {uid} not registered!")
 
-        set_rfid_callback(on_rfid)
+        set_rfid_callback(self.events.wrap("RFID", on_rfid))
 
-        set_ultrasonic_callback(self.on_ultrasonic_log)
+        set_ultrasonic_callback(self.events.wrap("ULTRASONIC", self.on_ultrasonic_log))
 
         # --- COIN EVENT HANDLING ---
         def on_coin():
@@ -97,19 +110,19 @@ class ArcadeApp(tk.Tk):
             add_credit_screen = self.frames.get("AddCreditScreen")
             if add_credit_screen:
                 print("[COIN DEBUG] Adding credit to screen")
-                self.after(0, add_credit_screen.on_coin_inserted)
+                add_credit_screen.on_coin_inserted()
             else:
                 print("[COIN DEBUG] No AddCreditScreen found!")
 
         from TESTCONTROLLER import set_coin_callback, set_touch_callback, set_proximity_callback
-        set_coin_callback(on_coin)
+        set_coin_callback(self.events.wrap("COIN", on_coin))
 
         # --- TOUCH EVENT HANDLING ---
         def on_touch(sensor_idx):
             game_intro_screen = self.frames.get("GameIntroScreen")
             if game_intro_screen:
-                self.after(0, lambda: game_intro_screen.on_mqtt_touch_event(sensor_idx))
-        set_touch_callback(on_touch)
+                game_intro_screen.on_mqtt_touch_event(sensor_idx)
+        set_touch_callback(self.events.wrap("TOUCH", on_touch))
 
         # --- PROXIMITY EVENT HANDLING ---
         # Tunnels are pathways that balls pass through BEFORE landing on color discs
@@ -121,17 +134,16 @@ class ArcadeApp(tk.Tk):
         # Map proximity sensors to tunnel names
         # These sensors detect balls passing through tunnels BEFORE they hit the color disc
         self.sensor_to_tunnel = {
-            "0": "Tunnel A",    # Changed from "sensor1" to "0"
-            "1": "Tunnel B",    # Changed from "sensor2" to "1" 
-            "2": "Tunnel C",    # Changed from "sensor3" to "2"
-            "3": "Tunnel D",    # Changed from "sensor4" to "3"
-            "4": "Tunnel E"     # Changed from "sensor5" to "4"
+            0: "Tunnel A",
+            1: "Tunnel B",
+            2: "Tunnel C",
+            3: "Tunnel D",
+            4: "Tunnel E"
         }
         
         def on_proximity(data):
             try:
-                sensor, state = data.split(":")
-                print(f"[PROXIMITY DEBUG] Raw data: {data}, Sensor: {sensor}, State: {state}")
+                sensor, state = data  # Parsed from "sensor:state" by TESTCONTROLLER
                 
                 if sensor not in self.proximity_last_state:
                     self.proximity_last_state[sensor] = state
@@ -143,7 +155,7 @@ class ArcadeApp(tk.Tk):
                 print(f"[PROXIMITY DEBUG] Sensor {sensor}: {last} -> {state}")
                 
                 # Ball passed through tunnel (falling edge: 1 -> 0)
-                if last == "1" and state == "0":
+                if last == 1 and state == 0:
                     self.proximity_count += 1
                     print(f"[PROXIMITY DEBUG] ✅ BALL DETECTED! Count: {self.proximity_count}")
                     
@@ -175,21 +187,15 @@ class ArcadeApp(tk.Tk):
                             send_status_cmd(self.mqtt_client, "STOP_PROXIMITY", topic_override="esp32/control/esp1")
             except Exception as e:
                 print(f"[Proximity Parse Error] {e}")
-        set_proximity_callback(on_proximity)
+        set_proximity_callback(self.events.wrap("PROXIMITY", on_proximity))
 
         # Register callback for LED colors
-        def on_led_colors(led_data):
+        def on_led_colors(colors):
             try:
-                # Parse LED colors from the message
-                # Example: "Color 1: Blue, Color 2: Black, Color 3: Orange"
-                if "Color 1:" in led_data and "Color 2:" in led_data and "Color 3:" in led_data:
-                    # Extract the 3 colors
-                    parts = led_data.split(", ")
-                    color1 = parts[0].split("Color 1: ")[1].strip()
-                    color2 = parts[1].split("Color 2: ")[1].strip() 
-                    color3 = parts[2].split("Color 3: ")[1].strip()
-                    
-                    self.led_colors = [color1, color2, color3]
+                # TESTCONTROLLER parses "Color 1: Blue, Color 2: Black, Color 3: Orange" into LedColor members
+                # (plain strings for names it does not know)
+                if colors:
+                    self.led_colors = [getattr(color, 'value', color) for color in colors[:3]]
                     print(f"🎆 LED Colors received from ESP32: {self.led_colors}")
                     
                     # Check if we're in gameplay screen and trigger multiplier check
@@ -213,7 +219,7 @@ class ArcadeApp(tk.Tk):
                     print(f"🎆 Running LED animation")
             except Exception as e:
                 print(f"[LED Color Parse Error] {e}")
-        set_led_callback(on_led_colors)
+        set_led_callback(self.events.wrap("LED", on_led_colors))
 
         container = tk.Frame(self)
         container.pack(fill="both", expand=True)
@@ -227,8 +233,24 @@ class ArcadeApp(tk.Tk):
             self.frames[ScreenClass.__name__] = frame
             frame.grid(row=0, column=0, sticky="nsew")
 
+        # Broker connection status, bottom-right above every screen; hidden while connected
+        self.mqtt_status_label = tk.Label(self, text="", font=("Press Start 2P", 8), fg="#ff6666", bg="#000000")
+        self.on_mqtt_state(self.mqtt_client.state, 0)
+
         self.show_frame("WelcomeScreen")
 
+    def on_mqtt_state(self, state, queued):
+        """Show the broker connection state (runs on the Tk thread via the event bus)"""
+        if state == MqttLink.CONNECTED:
+            self.mqtt_status_label.place_forget()
+            return
+        text = f"MQTT {state.upper()}"
+        if queued:
+            text += f" ({queued} queued)"
+        self.mqtt_status_label.configure(text=text)
+        self.mqtt_status_label.place(relx=1.0, rely=1.0, x=-8, y=-8, anchor="se")
+        self.mqtt_status_label.lift()
+
     def get_screen_size(self):
         """Get current screen dimensions"""
         return self.winfo_screenwidth(), self.winfo_screenheight()
@@ -270,6 +292,12 @@ class ArcadeApp(tk.Tk):
 
     def show_frame(self, screen_name):
         frame = self.frames[screen_name]
+
+        # Let the screen we are leaving release its resources (camera, worker processes)
+        previous = self.frames.get(getattr(self, 'current_frame', None))
+        if previous is not None and previous is not frame and hasattr(previous, 'on_screen_leave'):
+            previous.on_screen_leave()
+
         frame.tkraise()
         
         # Track current frame for LED callback
@@ -296,11 +324,21 @@ class ArcadeApp(tk.Tk):
         except Exception as e:
             print(f"[Screen Sound Error] {e}")
 
+    def shutdown_mqtt(self):
+        """Send the commands still scheduled, then stop the MQTT link"""
+        self.commands.stop()
+        self.commands.flush()  # Goes out while the link is still up
+        if self.mqtt_client.connected and not self.mqtt_client.wait_for_publish(timeout=2.0):
+            print("[MQTT] Some commands were not acknowledged before shutdown")
+        # Disconnect while the network loop still runs, so the DISCONNECT packet goes out too
+        self.mqtt_client.disconnect()
+        self.mqtt_client.loop_stop()
+
     def send_esp2_command(self, cmd):
-        send_status_cmd(self.mqtt_client, cmd, topic_override="esp32/control/esp2")
+        self.commands.send("esp2", cmd)
 
     def send_esp1_command(self, cmd):
-        send_status_cmd(self.mqtt_client, cmd, topic_override="esp32/control/esp1")
+        self.commands.send("esp1", cmd)
 
     def start_rfid(self):
         self.send_esp1_command("START_RFID")
@@ -412,3 +450,16 @@ if __name__ == "__main__":
     app.lift()
     app.focus_force()
     app.mainloop()
+
+    # Hand the long-lived camera back before exiting
+    gameplay = app.frames.get("GameplayScreen")
+    if gameplay is not None:
+        gameplay.shutdown_camera()
+    if app.mqtt_client.connected:
+        app.commands.flush()  # Window closed without going through shutdown_mqtt()
+    print(f"[Command Scheduler] {app.commands.stats()}")
+    unsent = app.commands.depth() + app.mqtt_client.stats()['queued_now']
+    if unsent:
+        print(f"[Command Scheduler] {unsent} command(s) never reached the broker")
+    app.events.dump()
+    command_latency.dump()
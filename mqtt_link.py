@@ -0,0 +1,184 @@
+"""Non-blocking MQTT connection with reconnect backoff and an offline command queue."""
+
+import itertools
+import json
+import threading
+from collections import OrderedDict
+import paho.mqtt.client as mqtt
+
+# Commands that undo each other: while offline only the newest of a group per topic is kept
+COALESCE_GROUPS = [
+    ("ULTRA_SCAN", "ULTRA_STOP"),
+    ("START_RFID", "STOP_RFID"),
+    ("START_COIN", "STOP_COIN"),
+    ("START_TOUCH", "STOP_TOUCH"),
+    ("START_PROXIMITY", "STOP_PROXIMITY"),
+    ("SOLENOID_ON", "SOLENOID_OFF"),
+    ("BEACON_ON", "BEACON_OFF"),
+    ("NEON_ON", "NEON_OFF"),
+]
+
+
+class MqttLink:
+    """paho client wrapper that never blocks the caller on the broker.
+
+    `start()` returns straight away: connecting, and reconnecting after a
+    drop, happens on paho's network thread with exponential backoff between
+    `min_delay` and `max_delay` seconds. `publish()` has the paho signature,
+    so `send_status_cmd()` can use the link like a client. While disconnected
+    messages go to a bounded queue (oldest dropped past `max_queued`) that is
+    flushed in order on reconnect. Only the state-toggle pairs in
+    COALESCE_GROUPS are coalesced: within a pair only the newest command
+    survives, moved to the back of the queue. Every other message, including
+    repeated one-shot actions such as SERVO_RUN, is kept and sent in order.
+
+    `on_state(state, queued)` is called whenever the state (CONNECTING,
+    CONNECTED, DISCONNECTED) or the queue depth changes, on whichever thread
+    caused it. `on_publish(topic, payload)` is called for every message
+    actually handed to paho, whether sent straight away or from the queue.
+    """
+
+    CONNECTING, CONNECTED, DISCONNECTED = "connecting", "connected", "disconnected"
+
+    def __init__(self, host, port=1883, client_id=None, keepalive=60, on_connect=None, on_message=None,
+                 min_delay=1, max_delay=30, max_queued=32, on_state=None, on_publish=None):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.max_queued = max_queued
+        self.user_on_connect = on_connect
+        self.on_state = on_state
+        self.on_publish = on_publish
+        self.state = self.DISCONNECTED
+        self._closing = False
+        self._queue = OrderedDict()  # coalesce key -> (topic, payload, qos)
+        self._lock = threading.Lock()
+        self._groups = {cmd: group for group in COALESCE_GROUPS for cmd in group}
+        self._sequence = itertools.count()  # Unique queue keys for messages that are never coalesced
+        self._last_info = None  # paho MQTTMessageInfo of the newest message handed to the client
+
+        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_message = on_message
+        self.client.reconnect_delay_set(min_delay=min_delay, max_delay=max_delay)
+
+        self.connects = 0
+        self.queued_messages = 0
+        self.coalesced_messages = 0
+        self.dropped_messages = 0
+
+    def start(self):
+        """Begin connecting in the background; returns immediately"""
+        self._closing = False
+        self._set_state(self.CONNECTING)
+        self.client.connect_async(self.host, self.port, keepalive=self.keepalive)
+        self.client.loop_start()  # Retries the first connection too, with the reconnect backoff
+
+    def loop_stop(self):
+        self.client.loop_stop()
+
+    def wait_for_publish(self, timeout=2.0):
+        """Block until the newest published message is acknowledged (paho sends in order); False on timeout"""
+        info = self._last_info
+        if info is None:
+            return True
+        try:
+            info.wait_for_publish(timeout=timeout)
+        except (RuntimeError, ValueError) as e:
+            print(f"[MQTT] Not waiting for outstanding messages: {e}")
+            return False
+        return info.is_published()
+
+    def disconnect(self):
+        self._closing = True
+        self.client.disconnect()
+        self._set_state(self.DISCONNECTED)
+
+    @property
+    def connected(self):
+        return self.state == self.CONNECTED
+
+    def publish(self, topic, payload, qos=1):
+        """Publish now if connected, otherwise queue (coalesced) until the next connect"""
+        with self._lock:
+            queued = self.state != self.CONNECTED
+            if queued:
+                self._enqueue(topic, payload, qos)
+        if queued:
+            self._notify()  # Lets the UI show the queue depth
+            return None
+        return self._send(topic, payload, qos)
+
+    def _send(self, topic, payload, qos):
+        info = self._last_info = self.client.publish(topic, payload, qos=qos)
+        if self.on_publish is not None:
+            self.on_publish(topic, payload)
+        return info
+
+    def _coalesce_key(self, topic, payload):
+        try:
+            group = self._groups.get(json.loads(payload).get("status"))
+        except (ValueError, AttributeError, TypeError):
+            group = None
+        if group is None:
+            return (topic, next(self._sequence))
+        return (topic, group)
+
+    def _enqueue(self, topic, payload, qos):
+        key = self._coalesce_key(topic, payload)
+        if key in self._queue:
+            del self._queue[key]  # The newer command replaces the earlier one and moves to the back
+            self.coalesced_messages += 1
+        elif len(self._queue) >= self.max_queued:
+            self._queue.popitem(last=False)
+            self.dropped_messages += 1
+        self._queue[key] = (topic, payload, qos)
+        self.queued_messages += 1
+
+    def _flush(self):
+        # Hold the lock while sending so a command published meanwhile cannot overtake the queue
+        with self._lock:
+            pending = list(self._queue.values())
+            self._queue.clear()
+            for topic, payload, qos in pending:
+                self._send(topic, payload, qos)
+            self.state = self.CONNECTED
+        if pending:
+            print(f"[MQTT] Sent {len(pending)} queued command(s)")
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties=None):
+        if self.user_on_connect is not None:
+            self.user_on_connect(client, userdata, flags, reason_code, properties)
+        if reason_code == 0:
+            self.connects += 1
+            self._flush()
+            self._notify()
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties=None):
+        if self._closing:
+            self._set_state(self.DISCONNECTED)
+            return
+        print(f"[MQTT] Disconnected (rc={reason_code}); reconnecting in the background")
+        self._set_state(self.CONNECTING)
+
+    def _set_state(self, state):
+        with self._lock:
+            changed = state != self.state
+            self.state = state
+        if changed:
+            self._notify()
+
+    def _notify(self):
+        if self.on_state is not None:
+            self.on_state(self.state, len(self._queue))
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'connects': self.connects,
+            'queued_now': len(self._queue),
+            'queued': self.queued_messages,
+            'coalesced': self.coalesced_messages,
+            'dropped': self.dropped_messages
+        }
@@ -3,6 +3,7 @@ import numpy as np
 import math
 import time
 from picamera2 import Picamera2
+from vision.sector_map import SectorMap
 import pygame
 
 # ========== CAMERA SETUP ==========
@@ -52,16 +53,11 @@ VISUAL_CONFIG = {
 }
 
 # ========== HELPER FUNCTIONS ==========
-def get_sector_label(center):
-    dx = center[0] - DISC_CENTER[0]
-    dy = DISC_CENTER[1] - center[1]  # Y inverted in image coords
-    angle = math.degrees(math.atan2(dy, dx))
-    angle = (angle + 360) % 360  # normalize to [0, 360)
+# Per-pixel sector index, built once from DISC_CENTER and the sector table
+sector_map = SectorMap(DISC_CENTER, sectors, (FRAME_WIDTH, FRAME_HEIGHT))
 
-    for label, start, end in sectors:
-        if start <= angle < end:
-            return label
-    return "Unknown"
+def get_sector_label(center):
+    return sector_map.label_at(center)
 
 def draw_sectors(frame):
     """Draw colorful sector lines and labels"""
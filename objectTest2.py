@@ -6,6 +6,7 @@ import numpy as np
 import math
 import time
 from picamera2 import Picamera2
+from vision.sector_map import SectorMap
 import pygame
 
 # ========== DISC CENTER (manually set if needed) ==========
@@ -41,16 +42,11 @@ VISUAL_CONFIG = {
     'ball_circle_thickness': 3
 }
 
-def get_sector_label(center):
-    dx = center[0] - DISC_CENTER[0]
-    dy = DISC_CENTER[1] - center[1]  # Y inverted in image coords
-    angle = math.degrees(math.atan2(dy, dx))
-    angle = (angle + 360) % 360  # normalize to [0, 360)
+# Per-pixel sector index, built once from DISC_CENTER and the sector table
+sector_map = SectorMap(DISC_CENTER, sectors, (1280, 960))
 
-    for label, start, end in sectors:
-        if start <= angle < end:
-            return label
-    return "Unknown"
+def get_sector_label(center):
+    return sector_map.label_at(center)
 
 def draw_sectors(frame):
     """Draw colorful sector lines and labels"""
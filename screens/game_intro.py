@@ -8,6 +8,7 @@ class GameIntroScreen(tk.Frame):
         super().__init__(parent)
         self.controller = controller
         self.selected_tunnels = []
+        self.handing_off_to_gameplay = False  # Set by drop_balls_action so leaving keeps the pre-warm
     # Get screen dimensions for responsive background
     self.update_idletasks()
     screen_width = controller.winfo_screenwidth()
@@ -164,6 +165,9 @@ class GameIntroScreen(tk.Frame):
             # 🎯 STORE TUNNEL PREDICTIONS IN CONTROLLER FOR FINAL SCORE
             self.controller.tunnel_predictions = selected.copy()
             print(f"🎯 TUNNEL PREDICTIONS STORED: {self.controller.tunnel_predictions}")
+
+            # Warm up camera and detector while the player picks up the balls
+            self.start_gameplay_prewarm()
             
             # Prompt user to pick up the ball
             from tkinter import messagebox
@@ -220,8 +224,25 @@ class GameIntroScreen(tk.Frame):
             self.drop_balls_button.destroy()
         # Reset tunnel selection after gameplay starts
         self.reset_tunnel_selection()
+        self.handing_off_to_gameplay = True
         self.controller.show_frame("GameplayScreen")
 
+    def start_gameplay_prewarm(self):
+        gameplay = self.controller.frames.get("GameplayScreen")
+        if gameplay is not None and hasattr(gameplay, 'prewarm'):
+            gameplay.prewarm()
+
+    def cancel_gameplay_prewarm(self):
+        gameplay = self.controller.frames.get("GameplayScreen")
+        if gameplay is not None and hasattr(gameplay, 'cancel_prewarm'):
+            gameplay.cancel_prewarm()
+
+    def on_screen_leave(self):
+        """Called when leaving this screen - anything but the gameplay handoff cancels the pre-warm"""
+        if not self.handing_off_to_gameplay:
+            self.cancel_gameplay_prewarm()
+        self.handing_off_to_gameplay = False
+
     def tkraise(self, *args, **kwargs):
         # Override to reset tunnel selection whenever this screen is shown
         self.reset_tunnel_selection()
@@ -1,11 +1,24 @@
 import tkinter as tk
 import os
-from PIL import Image, ImageTk
-from picamera2 import Picamera2
 import cv2
 import numpy as np
 import math
 import time
+import threading
+from vision.sector_map import SectorMap
+from vision.disc_roi import DiscROI
+from vision.camera_manager import CameraManager
+from vision.ball_detector import BallDetector
+from vision.detection_worker import DetectionWorker
+from vision.ball_tracker import BallTracker
+from vision.motion_gate import MotionGate
+from vision.buffer_pool import BufferPool
+from vision.stage_profiler import StageProfiler
+from vision.frame_scheduler import FrameScheduler
+from vision.static_overlay import StaticOverlay
+from vision.display_sink import DisplaySink
+from vision.sampled_logger import SampledLogger
+from ui.bindings import LabelBinding, BindingGroup
 
 class GameplayScreen(tk.Frame):
     def __init__(self, parent, controller):
@@ -25,6 +38,12 @@ class GameplayScreen(tk.Frame):
         self.camera_frame.place(relwidth=0.85, relheight=1.0, relx=0, rely=0)
         self.camera_label = tk.Label(self.camera_frame, bg="#000000")
         self.camera_label.pack(fill="both", expand=True)
+        # One persistent Tk image, scaled to the label and throttled separately from detection
+        self.DISPLAY_CONFIG = {
+            'max_fps': 30,
+            'fit_to_label': True
+        }
+        self.display_sink = DisplaySink(self.camera_label, **self.DISPLAY_CONFIG)
 
         # --- Right Side Panel for UI Elements ---
         self.ui_panel = tk.Frame(
@@ -108,6 +127,34 @@ class GameplayScreen(tk.Frame):
         )
         self.settling_label.pack(pady=2)
 
+        # Profiler readout (fps and p50/p95 frame/detection ms), empty unless profiling is enabled
+        self.perf_label = tk.Label(
+            self.ui_panel,
+            text="",
+            font=("Press Start 2P", 6),
+            fg="#888888",
+            bg="#000000",
+            justify="center",
+            wraplength=100
+        )
+        self.perf_label.pack(pady=2)
+
+        # Panel labels are only reconfigured when their text changes; the countdown at most 4x per second
+        self.panel = BindingGroup(
+            balls=LabelBinding(self.balls_count_label, "Balls: {}"),
+            sectors=LabelBinding(self.sectors_label, "Sectors:\n{}"),
+            settling=LabelBinding(self.settling_label, min_interval=0.25),
+            perf=LabelBinding(self.perf_label)  # update_perf_readout throttles before formatting
+        )
+
+        # Per-frame diagnostics: sampled (1 in every N frames) and level-filtered instead of printed each frame
+        self.LOGGING_CONFIG = {
+            'level': 'INFO',    # 'DEBUG' shows the per-frame detection counters
+            'sample_every': 30
+        }
+        self.detection_log = SampledLogger("DETECTION DEBUG", level=self.LOGGING_CONFIG['level'],
+                                           every=self.LOGGING_CONFIG['sample_every'])
+
         # Instructions
         instruction_label = tk.Label(
             self.ui_panel,
@@ -139,6 +186,24 @@ class GameplayScreen(tk.Frame):
         # ========== CAMERA SETUP FROM objectTest.py ==========
         self.FRAME_WIDTH, self.FRAME_HEIGHT = 1280, 960
         self.picam2 = None  # Initialize as None, will be created when needed
+        self.frame_grabber = None  # Background capture thread, started with the camera
+        # Dual-stream capture: detection runs on the small YUV420 'lores' stream, the main stream is display-only
+        self.CAMERA_CONFIG = {
+            'dual_stream': True,
+            'lores_size': (640, 480)  # Must divide the main size evenly; calibration stays in main-stream pixels
+        }
+        self.frame_buffers = BufferPool()  # Reused per-frame arrays (converted lores frame)
+        # One Picamera2 kept across rounds: paused between games, stopped and finally closed when idle
+        self.CAMERA_MANAGER_CONFIG = {
+            'stop_after': 15.0,     # Seconds paused before the sensor stops streaming
+            'idle_timeout': 120.0   # Seconds paused before the camera is closed completely
+        }
+        self.camera_manager = CameraManager(self.configure_camera, name="Camera", **self.CAMERA_MANAGER_CONFIG)
+        self.camera_update_job = None  # Pending after() id of the update_camera loop
+        self.prewarm_thread = None       # Background camera/detector warm-up started from GameIntroScreen
+        self.prewarm_token = None        # threading.Event of the latest run; set when it is cancelled
+        self.prewarm_done = None         # threading.Event of the latest run; set once it stops touching the camera
+        self.prewarm_lock = threading.Lock()
         
         # ========== OBJECT DETECTION SETUP FROM objectTest.py ==========
         # Disc center from objectTest.py
@@ -151,10 +216,25 @@ class GameplayScreen(tk.Frame):
             ("Orange",205, 263),
             ("Black",265, 324)
         ]
+        # Disc radius for the sector map (None = the whole frame counts as disc)
+        self.DISC_RADIUS = None
+        self.sector_map = SectorMap(self.DISC_CENTER, self.sectors,
+                                    (self.FRAME_WIDTH, self.FRAME_HEIGHT), self.DISC_RADIUS)
         
         # Ball color detection from objectTest.py (restored original)
         self.lower_ball = np.array([139, 155, 221])
         self.upper_ball = np.array([153, 236, 255])
+        # Coarse-to-fine detection: segment at 1/scale resolution, refine each ball at full resolution
+        self.PYRAMID_CONFIG = {
+            'scale': 1  # 1 = full resolution only, 2 = half, 4 = quarter
+        }
+        # Segmentation engine: 'watershed' (original) or 'components' (connected components + peak splitting)
+        self.SEGMENTATION_CONFIG = {
+            'engine': 'watershed'
+        }
+        self.ball_detector = BallDetector(self.lower_ball, self.upper_ball,
+                                          scale=self.PYRAMID_CONFIG['scale'],
+                                          engine=self.SEGMENTATION_CONFIG['engine'])
         
         # Visual config from objectTest.py (exact copy)
         self.VISUAL_CONFIG = {
@@ -171,10 +251,74 @@ class GameplayScreen(tk.Frame):
             'center_dot_size': 8,
             'ball_circle_thickness': 3
         }
+        # Sector lines, labels and the centre marker rendered once, re-rendered when calibration or VISUAL_CONFIG change
+        self.static_overlay = StaticOverlay(self.draw_static_overlay)
+
+        # Disc-only region of interest: detection only looks inside this circle
+        self.ROI_CONFIG = {
+            'enabled': True,
+            'radius': 400  # px around DISC_CENTER, same reach as the sector lines
+        }
+        self.disc_roi = None
+
+        # Polar mode: the disc ROI is unwrapped into an angle x radius image and balls are found there.
+        # Sectors become column ranges; needs ROI_CONFIG enabled (Cartesian detection otherwise)
+        self.POLAR_CONFIG = {
+            'enabled': False,
+            'angle_bins': 360,   # Columns per full turn
+            'radius_bins': 200,  # Rows from inner_radius to the ROI radius (main-stream px: 2 px per row)
+            'inner_radius': 0    # px around DISC_CENTER left out of the unwrapped image
+        }
+
+        # Out-of-process detection: frames go through shared memory, results come back as (x, y, r, sector id)
+        self.DETECTION_WORKER_CONFIG = {
+            'enabled': True,
+            'slots': 3,         # Frames that can be in flight at once
+            'max_restarts': 3   # Fall back to in-process detection after this many crashes
+        }
+        self.detection_worker = None
+        self.current_balls = []  # Newest detection as ((x, y), radius, sector label)
+
+        # Motion gate: while the disc is static, reuse the previous detection instead of segmenting again
+        self.MOTION_GATE_CONFIG = {
+            'enabled': True,
+            'scale': 2,                 # Downsampling factor of the detection frame for the grayscale difference image
+            'pixel_threshold': 15,      # Gray-level change that counts as a changed pixel
+            'min_changed_pixels': 8,    # Changed pixels (at gate scale) inside the disc that mean motion
+            'max_reuse': 30             # Force a full detection after this many reused frames
+        }
+        gate_settings = {k: v for k, v in self.MOTION_GATE_CONFIG.items() if k != 'enabled'}
+        self.motion_gate = MotionGate(**gate_settings)
         
-        # Settling time logic
-        self.SETTLING_TIME = 2
-        self.first_detection_time = None
+        # Settling logic: balls are settled once all 3 tracks hold still for settle_frames detections
+        self.SETTLING_CONFIG = {
+            'match_distance': 60,   # px a ball may move between detections and keep its track
+            'still_tolerance': 4,   # px per detection that still counts as stationary
+            'settle_frames': 15,    # consecutive stationary detections needed
+            'max_missed': 5         # detections a ball may drop out before its track is lost
+        }
+        self.ball_tracker = BallTracker(expected_count=3, **self.SETTLING_CONFIG)
+
+        # Per-stage timing of update_camera (capture, gate, hsv, morphology, segmentation, overlay, photo)
+        self.PROFILER_CONFIG = {
+            'enabled': False,        # Almost free when off: one attribute check per stage
+            'window': 300,           # Frames kept for the rolling p50/p95/p99
+            'readout_interval': 0.5  # Seconds between ui_panel readout refreshes
+        }
+        self.profiler = StageProfiler(window=self.PROFILER_CONFIG['window'],
+                                      enabled=self.PROFILER_CONFIG['enabled'])
+        self.ball_detector.set_profiler(self.profiler)
+        self.last_readout_time = 0.0
+        self.bind_all("<F9>", self.on_profile_key)  # App-wide so it works without focus; ignored on other screens
+
+        # Frame pacing: next update is due one period after the last one started; over-budget frames skip detection
+        self.SCHEDULER_CONFIG = {
+            'target_fps': 30,
+            'budget_ratio': 0.9,    # Fraction of the period update_camera may use before the next frame is display-only
+            'max_skip_streak': 2    # Never skip detection on more frames than this in a row
+        }
+        self.frame_scheduler = FrameScheduler(**self.SCHEDULER_CONFIG)
+        self.first_detection_time = None  # When 3 tracked balls were first seen (for time-to-result logging)
         self.balls_settled = False
         self.detected_sectors = []
         self.ball_count = 0
@@ -182,15 +326,25 @@ class GameplayScreen(tk.Frame):
 
         # Don't start camera automatically - wait for screen to be shown
 
+    def configure_camera(self, picam2):
+        """Apply the stream configuration to a freshly opened camera; returns the streams to capture"""
+        main = {"size": (self.FRAME_WIDTH, self.FRAME_HEIGHT), "format": "RGB888"}
+        if self.CAMERA_CONFIG.get('dual_stream', False):
+            lores = {"size": self.detect_size(), "format": "YUV420"}
+            config = picam2.create_preview_configuration(main=main, lores=lores)
+            streams = ("main", "lores")
+        else:
+            config = picam2.create_preview_configuration(main=main)
+            streams = ("main",)
+        picam2.configure(config)
+        return streams
+
     def init_camera(self):
-        """Initialize and start the camera when the screen is shown"""
+        """Resume (or open on first use) the shared camera when the screen is shown"""
         if self.picam2 is None:
             try:
-                print("[Camera] Initializing camera...")
-                self.picam2 = Picamera2()
-                config = self.picam2.create_preview_configuration(main={"size": (self.FRAME_WIDTH, self.FRAME_HEIGHT), "format": "RGB888"})
-                self.picam2.configure(config)
-                self.picam2.start()
+                self.frame_grabber = self.camera_manager.acquire()
+                self.picam2 = self.camera_manager.picam2
                 self.camera_running = True
                 print("[Camera] Camera started successfully")
                 self.update_camera()  # Start the camera update loop
@@ -199,53 +353,237 @@ class GameplayScreen(tk.Frame):
                 self.camera_running = False
 
     def cleanup_camera(self):
-        """Clean up camera resources"""
+        """Pause the camera between rounds; the manager stops and closes it once idle"""
         try:
             self.camera_running = False
-            if hasattr(self, 'picam2') and self.picam2 is not None:
-                print("[Camera] Stopping camera...")
-                self.picam2.stop()
-                self.picam2.close()
+            if self.camera_update_job is not None:
+                self.after_cancel(self.camera_update_job)
+                self.camera_update_job = None
+            if self.picam2 is not None:
+                print("[Camera] Pausing camera...")
+                self.camera_manager.release()
+                self.frame_grabber = None
                 self.picam2 = None
-                print("[Camera] Camera stopped successfully")
         except Exception as e:
             print(f"[Camera Cleanup Error] {e}")
 
+    def prewarm(self):
+        """Start camera streaming, the detection worker and detector state ahead of the round.
+
+        Called by GameIntroScreen once tunnels are confirmed; the slow parts run
+        in a background thread so the intro screen stays responsive. Each run
+        gets its own cancel token, and a run waits for the previous one to
+        finish, so two runs never touch the detector state at once.
+        """
+        if self.camera_running:
+            return
+        previous = self.prewarm_thread
+        if previous is not None and previous.is_alive() and not self.prewarm_token.is_set():
+            return  # Already warming
+        self.prewarm_token = threading.Event()
+        self.prewarm_done = threading.Event()
+        self.start_detection_worker()
+        self.prewarm_thread = threading.Thread(target=self._prewarm_run,
+                                               args=(self.prewarm_token, self.prewarm_done, previous),
+                                               name="Gameplay Prewarm", daemon=True)
+        self.prewarm_thread.start()
+
+    def _prewarm_run(self, token, done, previous):
+        if previous is not None:
+            previous.join()  # A cancelled run still releasing the camera
+        start = time.perf_counter()
+        try:
+            self.camera_manager.warm()
+        except Exception as e:
+            print(f"[Prewarm Error] Camera: {e}")
+        try:
+            # Size every detector, gate, sector map and overlay buffer for the real frames
+            detect_width, detect_height = self.detect_size()
+            blank = np.zeros((detect_height, detect_width, 3), np.uint8)
+            self.sync_detector()
+            self.ball_detector.detect(blank, None, self.get_disc_roi())
+            self.motion_gate.is_static(blank, self.get_disc_roi())
+            self.motion_gate.reset()
+            self.sector_map.update(self.DISC_CENTER, self.sectors,
+                                   (self.FRAME_WIDTH, self.FRAME_HEIGHT), self.DISC_RADIUS)
+            self.static_overlay.update(self.overlay_key(), (self.FRAME_HEIGHT, self.FRAME_WIDTH, 3))
+        except Exception as e:
+            print(f"[Prewarm Error] Detector: {e}")
+        # The token is read under the lock cancel_prewarm() sets it under, so exactly one side releases
+        with self.prewarm_lock:
+            cancelled = token.is_set()
+            done.set()
+        if cancelled:
+            self.camera_manager.release()
+            print("[Prewarm] Cancelled")
+        else:
+            print(f"[Prewarm] Camera and detector ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def cancel_prewarm(self):
+        """Undo prewarm() when the player backs out before the round starts"""
+        if self.camera_running or self.prewarm_token is None:
+            return
+        with self.prewarm_lock:
+            if self.prewarm_token.is_set():
+                return
+            self.prewarm_token.set()
+            finished = self.prewarm_done.is_set()
+        if finished:
+            self.camera_manager.release()  # Idle timers stop and close the camera later
+        # Otherwise the run releases the camera itself when it sees the token
+        self.stop_detection_worker()
+
+    def shutdown_camera(self):
+        """Fully release the camera and the detection worker (application exit)"""
+        self.cleanup_camera()
+        self.stop_detection_worker()  # Joins the process and unlinks its shared-memory frame ring
+        self.camera_manager.close()
+
+    def start_detection_worker(self):
+        """Launch the detection worker process if enabled"""
+        if not self.DETECTION_WORKER_CONFIG.get('enabled', False) or self.detection_worker is not None:
+            return
+        detect_width, detect_height = self.detect_size()
+        self.detection_worker = DetectionWorker(
+            (detect_height, detect_width, 3),
+            self.detection_config(),
+            slots=self.DETECTION_WORKER_CONFIG['slots'],
+            max_restarts=self.DETECTION_WORKER_CONFIG['max_restarts']
+        )
+        self.detection_worker.start()
+
+    def stop_detection_worker(self):
+        """Shut down the detection worker process"""
+        if self.detection_worker is not None:
+            self.detection_worker.stop()
+            self.detection_worker = None
+
+    def get_segmentation_cost(self):
+        """Per-frame cost of the active segmentation engine (from the worker when it is running)"""
+        worker = self.detection_worker
+        if worker is not None and not worker.failed:
+            return {'engine': self.SEGMENTATION_CONFIG['engine'], 'last_ms': round(worker.segmentation_ms, 2)}
+        return self.ball_detector.engine.stats()
+
+    def detection_config(self):
+        """Plain-data snapshot of everything the detection worker needs"""
+        roi_radius = self.ROI_CONFIG['radius'] if self.ROI_CONFIG.get('enabled', False) else None
+        return {
+            'lower_ball': self.lower_ball.tolist(),
+            'upper_ball': self.upper_ball.tolist(),
+            'disc_center': tuple(self.DISC_CENTER),
+            'sectors': [tuple(sector) for sector in self.sectors],
+            'frame_size': (self.FRAME_WIDTH, self.FRAME_HEIGHT),
+            'detect_size': self.detect_size(),
+            'input_scale': self.detect_scale(),
+            'roi_radius': roi_radius,
+            'disc_radius': self.DISC_RADIUS,
+            'pyramid_scale': self.PYRAMID_CONFIG['scale'],
+            'segmentation_engine': self.SEGMENTATION_CONFIG['engine'],
+            'polar': self.polar_settings(),
+            'profile': self.profiler.enabled
+        }
+
     def tkraise(self, aboveThis=None):
         """Override tkraise to start camera when screen is shown"""
+        if self.prewarm_thread is not None:
+            # Normally finished long ago; otherwise wait for the camera it is opening
+            self.prewarm_thread.join(timeout=5.0)
+            self.prewarm_thread = None
         self.reset_detection()
         super().tkraise(aboveThis)
+        self.start_detection_worker()
         if not self.camera_running:
             self.init_camera()
 
     def reset_detection(self):
         """Reset detection state for new game"""
         self.first_detection_time = None
+        self.ball_tracker.reset()
+        self.motion_gate.reset()
+        self.profiler.reset()
+        self.frame_scheduler.reset()
         self.balls_settled = False
         self.detected_sectors = []
         self.ball_count = 0
         self.auto_scored = False
         self.led_multiplier_info = None  # Reset LED multiplier info
-        self.balls_count_label.configure(text="Balls: 0")
-        self.sectors_label.configure(text="Sectors:\nNone")
-        self.settling_label.configure(text="")
+        self.current_balls = []
+        self.detection_log.reset()
+        self.panel.set('balls', 0, force=True)
+        self.panel.set('sectors', "None", force=True)
+        self.panel.set('settling', "", force=True)
 
     def on_screen_leave(self):
-        """Called when leaving this screen - stop camera to save resources"""
+        """Called when leaving this screen - stop camera and detection worker to save resources"""
+        print(f"[Detection] Segmentation cost: {self.get_segmentation_cost()}")
+        print(f"[Detection] Motion gate: {self.motion_gate.stats()}")
+        print(f"[Detection] Frame scheduler: {self.frame_scheduler.stats()}")
+        print(f"[Detection] Display: {self.display_sink.stats()}")
+        print(f"[Detection] Camera: {self.camera_manager.stats()}")
+        print(f"[Detection] Panel updates: {self.panel.stats()}")
+        if self.profiler.enabled:
+            self.dump_profile()
         self.cleanup_camera()
+        self.stop_detection_worker()
+
+    def dump_profile(self):
+        """Print the per-stage timing table (F9 while profiling is enabled)"""
+        if not self.profiler.enabled:
+            print("[Stage Profiler] Disabled (set PROFILER_CONFIG['enabled'])")
+            return None
+        return self.profiler.dump("Gameplay Profiler")
+
+    def on_profile_key(self, event=None):
+        if getattr(self.controller, 'current_frame', None) == "GameplayScreen":
+            self.dump_profile()
+
+    def update_perf_readout(self):
+        """Refresh the fps/latency readout in the ui_panel, at most every readout_interval seconds"""
+        now = time.monotonic()
+        if now - self.last_readout_time < self.PROFILER_CONFIG['readout_interval']:
+            return
+        self.last_readout_time = now
+        self.panel.set('perf', f"{self.profiler.readout()}\nskip {self.frame_scheduler.skipped_frames}")
 
     def get_sector_label(self, center):
-        """Get sector label based on ball position - from objectTest.py"""
-        dx = center[0] - self.DISC_CENTER[0]
-        dy = self.DISC_CENTER[1] - center[1]  # Y inverted in image coords
-        angle = math.degrees(math.atan2(dy, dx))
-        angle = (angle + 360) % 360  # normalize to [0, 360)
-
-        for label, start, end in self.sectors:
-            if start <= angle < end:
-                return label
+        """Get sector label based on ball position using the precomputed sector map"""
+        # Rebuilds the map only if DISC_CENTER or the sector table changed
+        self.sector_map.update(self.DISC_CENTER, self.sectors,
+                               (self.FRAME_WIDTH, self.FRAME_HEIGHT), self.DISC_RADIUS)
+        return self.sector_map.label_at(center)
+
+    def get_sector_name(self, code):
+        """Get sector label for a sector id from the sector map (e.g. from the detection worker)"""
+        self.sector_map.update(self.DISC_CENTER, self.sectors,
+                               (self.FRAME_WIDTH, self.FRAME_HEIGHT), self.DISC_RADIUS)
+        if code < len(self.sector_map.names):
+            return self.sector_map.names[code]
         return "Unknown"
 
+    def detect_size(self):
+        """(width, height) of the frames detection runs on"""
+        if self.CAMERA_CONFIG.get('dual_stream', False):
+            return tuple(self.CAMERA_CONFIG['lores_size'])
+        return (self.FRAME_WIDTH, self.FRAME_HEIGHT)
+
+    def detect_scale(self):
+        """Factor from detection-frame pixels to main-stream (calibration) pixels"""
+        return max(1, self.FRAME_WIDTH // self.detect_size()[0])
+
+    def get_disc_roi(self):
+        """Return the disc ROI in detection-frame coordinates, or None when disabled"""
+        if not self.ROI_CONFIG.get('enabled', False):
+            return None
+        scale = self.detect_scale()
+        center = (self.DISC_CENTER[0] // scale, self.DISC_CENTER[1] // scale)
+        radius = self.ROI_CONFIG['radius'] // scale
+        if self.disc_roi is None:
+            self.disc_roi = DiscROI(center, radius, self.detect_size())
+        else:
+            self.disc_roi.update(center, radius, self.detect_size())
+        return self.disc_roi
+
     def draw_sectors(self, frame):
         """Draw colorful sector lines and labels - exact copy from objectTest.py"""
         for label, angle_start, angle_end in self.sectors:
@@ -270,152 +608,66 @@ class GameplayScreen(tk.Frame):
             cv2.putText(frame, label, (lx - text_size[0]//2, ly), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
-    def detect_multiple_balls_and_sectors(self, frame, hsv):
-        """Detect multiple balls and return their sectors using advanced separation techniques - EXACT COPY from objectTest.py"""
-        detected_sectors = []
-        
-        # Threshold for ball color
-        mask = cv2.inRange(hsv, self.lower_ball, self.upper_ball)
+    def draw_static_overlay(self, canvas):
+        """Everything that only depends on calibration: sector lines, labels and the disc centre"""
+        self.draw_sectors(canvas)
+        cv2.circle(canvas, self.DISC_CENTER, self.VISUAL_CONFIG['center_dot_size'], (255, 255, 255), -1)
+        cv2.circle(canvas, self.DISC_CENTER, self.VISUAL_CONFIG['center_dot_size'] + 2, (0, 0, 0), 2)
 
-        # Enhanced morphology to clean noise and separate touching balls
-        kernel = np.ones((3, 3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=2)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=2)
+    def overlay_key(self):
+        """Everything the static overlay depends on; any change triggers a re-render"""
+        return (tuple(self.DISC_CENTER), tuple(tuple(sector) for sector in self.sectors), repr(self.VISUAL_CONFIG))
 
-        # Use distance transform and watershed to separate touching balls
-        dist_transform = cv2.distanceTransform(mask, cv2.DIST_L2, 5)
-        
-        # Find local maxima (ball centers)
-        _, sure_fg = cv2.threshold(dist_transform, 0.4 * dist_transform.max(), 255, 0)
-        sure_fg = np.uint8(sure_fg)
-        
-        # Find sure background area
-        sure_bg = cv2.dilate(mask, kernel, iterations=3)
-        unknown = cv2.subtract(sure_bg, sure_fg)
-        
-        # Marker labelling
-        _, markers = cv2.connectedComponents(sure_fg)
-        markers = markers + 1
-        markers[unknown == 255] = 0
-        
-        # Apply watershed
-        frame_copy = frame.copy()
-        markers = cv2.watershed(frame_copy, markers)
-        
-        ball_count = 0
-        
-        # Process each detected region
-        for marker_id in range(2, markers.max() + 1):
-            # Create mask for this specific ball
-            ball_mask = np.uint8(markers == marker_id)
-            
-            # Calculate area to filter out noise
-            area = cv2.countNonZero(ball_mask)
-            if area < 300:  # Minimum area for a ball (reduced from 500)
-                continue
-                
-            # Find contour for this ball
-            contours, _ = cv2.findContours(ball_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            if not contours:
-                continue
-                
-            contour = max(contours, key=cv2.contourArea)
-            (x, y), radius = cv2.minEnclosingCircle(contour)
-            center = (int(x), int(y))
-            radius = int(radius)
-            
-            # Additional validation: check if radius is reasonable for a ball
-            if radius < 8 or radius > 100:  # Adjust these values based on your ball size
-                continue
-                
-            ball_count += 1
-            
+    def sync_detector(self):
+        """Push the current thresholds, pyramid scale and engine into the in-process detector"""
+        self.ball_detector.set_thresholds(self.lower_ball, self.upper_ball)
+        self.ball_detector.scale = self.PYRAMID_CONFIG['scale']
+        self.ball_detector.input_scale = self.detect_scale()
+        self.ball_detector.set_engine(self.SEGMENTATION_CONFIG['engine'])
+        self.ball_detector.set_polar(self.polar_settings(), self.sectors)
+
+    def polar_settings(self):
+        """POLAR_CONFIG without the enabled flag, or None when polar mode is off"""
+        if not self.POLAR_CONFIG.get('enabled', False):
+            return None
+        return {k: v for k, v in self.POLAR_CONFIG.items() if k != 'enabled'}
+
+    def detect_multiple_balls_and_sectors(self, frame, hsv, detect_frame=None):
+        """Detect multiple balls and return their sectors using advanced separation techniques - from objectTest.py
+
+        Detection runs on `detect_frame` (the lores stream) when given; balls are drawn on `frame`.
+        """
+        self.sync_detector()
+        source = frame if detect_frame is None else detect_frame
+        balls = self.ball_detector.detect(source, hsv, self.get_disc_roi())
+        codes = self.ball_detector.last_codes
+        if codes is not None:
+            # Polar mode: sectors already come from the blob columns
+            self.current_balls = [(center, radius, self.get_sector_name(code))
+                                  for (center, radius), code in zip(balls, codes)]
+        else:
+            self.current_balls = [(center, radius, self.get_sector_label(center)) for center, radius in balls]
+        return self.draw_ball_detections(frame, self.current_balls)
+
+    def draw_ball_detections(self, frame, balls):
+        """Draw ball circles, numbers and sectors; balls are ((x, y), radius, sector_label)"""
+        detected_sectors = []
+        for ball_count, (center, radius, sector_label) in enumerate(balls, start=1):
             # Draw colorful ball detection (only outer circle, no inner dot)
             cv2.circle(frame, center, radius, (0, 255, 255), self.VISUAL_CONFIG['ball_circle_thickness'])
-            # Removed the small inner circle: cv2.circle(frame, center, 5, (0, 0, 255), -1)
-            
+
             # Add ball number
             cv2.putText(frame, f"Ball {ball_count}", (center[0] - 25, center[1] - radius - 10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
 
-            sector_label = self.get_sector_label(center)
             detected_sectors.append(sector_label)
-            
+
             # Show sector for each ball
             cv2.putText(frame, sector_label, (center[0] - 20, center[1] + radius + 20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, 
                        self.VISUAL_CONFIG['sector_colors'].get(sector_label, (255, 255, 255)), 2)
         
-        # Fallback: if watershed didn't find enough balls, try contour-based detection
-        if ball_count < 2:
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            if contours:
-                # Sort contours by area (largest first)
-                contours = sorted(contours, key=cv2.contourArea, reverse=True)
-                
-                # Reset for fallback method
-                detected_sectors = []
-                ball_count = 0
-                
-                for contour in contours:
-                    if cv2.contourArea(contour) > 300:  # ignore small noise
-                        # Check if this is likely multiple balls by analyzing the contour
-                        hull = cv2.convexHull(contour)
-                        hull_area = cv2.contourArea(hull)
-                        contour_area = cv2.contourArea(contour)
-                        solidity = float(contour_area) / hull_area
-                        
-                        (x, y), radius = cv2.minEnclosingCircle(contour)
-                        center = (int(x), int(y))
-                        radius = int(radius)
-                        
-                        # If solidity is low, might be multiple touching balls
-                        if solidity < 0.7 and radius > 25:
-                            # Try to estimate number of balls based on area
-                            estimated_ball_area = np.pi * (radius / 1.5) ** 2
-                            num_balls = max(1, int(contour_area / estimated_ball_area))
-                            
-                            # Create multiple detection points for touching balls
-                            moments = cv2.moments(contour)
-                            if moments['m00'] != 0:
-                                cx = int(moments['m10'] / moments['m00'])
-                                cy = int(moments['m01'] / moments['m00'])
-                                
-                                for i in range(min(num_balls, 3)):  # Max 3 balls
-                                    ball_count += 1
-                                    offset_x = (i - 1) * radius // 2
-                                    ball_center = (cx + offset_x, cy)
-                                    
-                                    cv2.circle(frame, ball_center, radius, (0, 255, 255), self.VISUAL_CONFIG['ball_circle_thickness'])
-                                    # Removed small inner circle: cv2.circle(frame, ball_center, 5, (0, 0, 255), -1)
-                                    
-                                    cv2.putText(frame, f"Ball {ball_count}", (ball_center[0] - 25, ball_center[1] - radius - 10), 
-                                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-                                    
-                                    sector_label = self.get_sector_label(ball_center)
-                                    detected_sectors.append(sector_label)
-                                    
-                                    cv2.putText(frame, sector_label, (ball_center[0] - 20, ball_center[1] + radius + 20), 
-                                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, 
-                                               self.VISUAL_CONFIG['sector_colors'].get(sector_label, (255, 255, 255)), 2)
-                        else:
-                            # Single ball
-                            ball_count += 1
-                            
-                            cv2.circle(frame, center, radius, (0, 255, 255), self.VISUAL_CONFIG['ball_circle_thickness'])
-                            # Removed small inner circle: cv2.circle(frame, center, 5, (0, 0, 255), -1)
-                            
-                            cv2.putText(frame, f"Ball {ball_count}", (center[0] - 25, center[1] - radius - 10), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)
-
-                            sector_label = self.get_sector_label(center)
-                            detected_sectors.append(sector_label)
-                            
-                            cv2.putText(frame, sector_label, (center[0] - 20, center[1] + radius + 20), 
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, 
-                                       self.VISUAL_CONFIG['sector_colors'].get(sector_label, (255, 255, 255)), 2)
-        
-        return detected_sectors, ball_count
+        return detected_sectors, len(balls)
 
     def get_sectors_as_string(self, detected_sectors):
         """Convert detected sectors to a formatted string - from objectTest.py"""
@@ -439,79 +691,136 @@ class GameplayScreen(tk.Frame):
 
     def update_camera(self):
         # Only update if camera is running and initialized
-        if not self.camera_running or self.picam2 is None:
+        if not self.camera_running or self.picam2 is None or self.frame_grabber is None:
             return
             
         try:
-            frame = self.picam2.capture_array()
-            hsv = cv2.cvtColor(frame, cv2.COLOR_RGB2HSV)
+            profiler = self.profiler
+            frame_start = stage_start = profiler.begin()
+            # Newest complete frame from the capture thread; stale frames are dropped there
+            latest = self.frame_grabber.get_latest()
+            if latest is None:
+                self.camera_update_job = self.after(5, self.update_camera)  # No new frame yet, poll again shortly
+                return
+            # False when the previous frame overran its budget: this one is display-only
+            detect_now = self.frame_scheduler.begin_frame()
+            if self.CAMERA_CONFIG.get('dual_stream', False):
+                frame, lores = latest
+                # Only the small stream is colour-converted; BGR order matches the main stream's RGB888 layout
+                detect_shape = (lores.shape[0] * 2 // 3, lores.shape[1], 3)
+                detect_frame = cv2.cvtColor(lores, cv2.COLOR_YUV2BGR_I420,
+                                            dst=self.frame_buffers.get('detect', detect_shape))
+            else:
+                frame = detect_frame = latest
+            profiler.end('capture', stage_start)
+
+            # A static disc (nothing changed since the last detection) reuses the previous result
+            stage_start = profiler.begin()
+            static = (detect_now and self.MOTION_GATE_CONFIG.get('enabled', False)
+                      and self.motion_gate.is_static(detect_frame, self.get_disc_roi()))
+            profiler.end('gate', stage_start)
 
-            # Detect all balls and their sectors using objectTest.py logic
-            detected_sectors, ball_count = self.detect_multiple_balls_and_sectors(frame, hsv)
+            worker = self.detection_worker
+            new_detection = detect_now  # A frame the gate saw as static is fresh evidence that balls are still
+            if worker is not None and not worker.failed:
+                # Vision runs in the worker process; here we only draw its newest result
+                worker.update_config(self.detection_config())
+                result = worker.poll()
+                if result is not None:
+                    self.current_balls = [((x, y), radius, self.get_sector_name(code))
+                                         for x, y, radius, code in result[1]]
+                    if profiler.enabled:
+                        # Stage timings measured inside the worker process
+                        profiler.record('detect', worker.detection_ms)
+                        for stage, ms in (worker.last_stages or {}).items():
+                            profiler.record(stage, ms)
+                if detect_now and not static and worker.submit(detect_frame):
+                    self.motion_gate.mark_detected(worker.detection_ms)
+                new_detection = result is not None or static
+                detected_sectors, ball_count = self.draw_ball_detections(frame, self.current_balls)
+            elif static or not detect_now:
+                detected_sectors, ball_count = self.draw_ball_detections(frame, self.current_balls)
+            else:
+                # The detector converts only the disc ROI (or the coarse pyramid level) to HSV
+                detection_start = time.perf_counter()
+                detected_sectors, ball_count = self.detect_multiple_balls_and_sectors(frame, None, detect_frame)
+                detection_ms = (time.perf_counter() - detection_start) * 1000
+                self.motion_gate.mark_detected(detection_ms)
+                if profiler.enabled:
+                    profiler.record('detect', detection_ms)
             self.detected_sectors = detected_sectors
             self.ball_count = ball_count
             
             # Get sectors as string for display
             sectors_string = self.get_sectors_as_string(detected_sectors)
             
-            # Update UI labels
-            self.balls_count_label.configure(text=f"Balls: {ball_count}")
-            self.sectors_label.configure(text=f"Sectors:\n{sectors_string}")
+            # Update UI labels (no-ops unless the text changed)
+            self.panel.set('balls', ball_count)
+            self.panel.set('sectors', sectors_string)
             
             # Check if we have exactly 3 balls with valid sectors
             valid_sectors = [sector for sector in detected_sectors if sector != "Unknown"]
+
+            # Only fresh detections move the tracker; a repeated worker result is not a new still frame
+            tracker = self.ball_tracker
+            if new_detection:
+                tracker.update([center for center, _, _ in self.current_balls])
+
+            # Sectors of the tracked balls stay stable through brief detection dropouts
+            tracked_sectors = [self.get_sector_label(center) for center in tracker.positions()]
+            tracked_valid = [sector for sector in tracked_sectors if sector != "Unknown"]
             
-            # DEBUG: Enhanced logging for detection issues
-            print(f"[DETECTION DEBUG] Ball count: {ball_count}, Valid sectors: {len(valid_sectors)}, Sectors: {valid_sectors}")
-            print(f"[DETECTION DEBUG] Balls settled: {self.balls_settled}, First detection time: {self.first_detection_time}")
+            # DEBUG: Enhanced logging for detection issues (sampled, DEBUG level only)
+            log = self.detection_log
+            log.debug('counts', "Ball count: %d, Valid sectors: %d, Sectors: %s", ball_count, len(valid_sectors), valid_sectors)
+            log.debug('settling', "Balls settled: %s, Tracks: %d, Frames to settle: %d",
+                      self.balls_settled, len(tracker.tracks), tracker.settle_progress())
             
-            # Handle settling time logic from objectTest.py - REQUIRE EXACTLY 3 BALLS AND 3 VALID SECTORS
-            if ball_count == 3 and len(valid_sectors) == 3 and not self.balls_settled:
+            # Handle settling from the tracker - REQUIRE EXACTLY 3 TRACKED BALLS AND 3 VALID SECTORS
+            if len(tracker.tracks) == 3 and len(tracked_valid) == 3:
                 if self.first_detection_time is None:
                     self.first_detection_time = time.time()
-                    print(f"🕒 3 balls and 3 valid sectors detected! Waiting {self.SETTLING_TIME} seconds for balls to settle...")
-                
-                # Calculate remaining time
-                elapsed_time = time.time() - self.first_detection_time
-                remaining_time = self.SETTLING_TIME - elapsed_time
-                
-                if remaining_time > 0:
-                    # Display countdown
-                    self.settling_label.configure(text=f"Settling... {remaining_time:.1f}s")
+                    print(f"🕒 3 balls and 3 valid sectors tracked! Waiting for them to hold still for {tracker.settle_frames} frames...")
+
+                if tracker.settled:
+                    if not self.balls_settled:
+                        self.balls_settled = True
+                        self.panel.set('settling', "Balls settled! Waiting for LED colors...", force=True)
+                        print(f"✅ Balls have settled after {time.time() - self.first_detection_time:.1f}s! Final count validation...")
+                        print(f"🎯 Final ball positions: {self.get_sectors_as_string(tracked_sectors)}")
+                        print(f"⏳ Waiting for ESP32 to send LED colors for multiplier check...")
                 else:
-                    self.balls_settled = True
-                    self.settling_label.configure(text="Balls settled! Waiting for LED colors...")
-                    print(f"✅ Balls have settled! Final count validation...")
-                    print(f"🎯 Final ball positions: {sectors_string}")
-                    print(f"⏳ Waiting for ESP32 to send LED colors for multiplier check...")
+                    if self.balls_settled:
+                        print(f"⚠️ BALLS MOVED AFTER SETTLING! Waiting for them to settle again...")
+                    self.balls_settled = False
+                    # Display countdown estimated from the measured detection rate (rate-limited)
+                    self.panel.set('settling', f"Settling... {tracker.remaining_time():.1f}s")
             
-            elif ball_count != 3 or len(valid_sectors) != 3:
-                # Reset if ball count changes
+            else:
+                # Reset if a tracked ball is lost or a new one appears
                 if self.balls_settled:
                     print(f"⚠️ BALL/SECTOR COUNT CHANGED AFTER SETTLING!")
                     print(f"   - Previous state: settled with 3 balls and 3 valid sectors")
-                    print(f"   - Current ball count: {ball_count}")
-                    print(f"   - Current valid sectors: {len(valid_sectors)}")
-                    print(f"   - Current sectors: {valid_sectors}")
+                    print(f"   - Current tracked balls: {len(tracker.tracks)}")
+                    print(f"   - Current valid sectors: {len(tracked_valid)}")
+                    print(f"   - Current sectors: {tracked_valid}")
                     print(f"   - Resetting settling state...")
                 
                 self.first_detection_time = None
                 self.balls_settled = False
-                self.settling_label.configure(text="")
+                self.panel.set('settling', "", force=True)
             
             # Check for game completion with enhanced validation
-            if ball_count == 3 and len(valid_sectors) == 3 and self.balls_settled:
-                print(f"🎮 GAME COMPLETION CHECK:")
-                print(f"   - Ball count: {ball_count} (need 3) ✅")
-                print(f"   - Valid sectors: {len(valid_sectors)} (need 3) ✅")
-                print(f"   - Balls settled: {self.balls_settled} ✅")
-                print(f"   - Current sectors: {valid_sectors}")
-                print(f"   - Ball count detected: {self.ball_count}")
-                print(f"   - Auto-scored attribute exists: {hasattr(self, 'auto_scored')}")
-                if hasattr(self, 'auto_scored'):
-                    print(f"   - Auto-scored value: {self.auto_scored}")
+            if self.balls_settled:
+                # Score the settled track positions, not whatever this single frame saw
+                self.detected_sectors = tracked_sectors
+                self.ball_count = len(tracked_sectors)
+                log.info('completion', "🎮 GAME COMPLETION CHECK: tracked balls %d, valid sectors %d, settled %s, "
+                         "sectors %s, detected this frame %d, auto-scored %s",
+                         len(tracker.tracks), len(tracked_valid), self.balls_settled, tracked_valid,
+                         ball_count, getattr(self, 'auto_scored', None))
                 
-                self.settling_label.configure(text="🎯 3 BALLS DETECTED! Auto-advancing to results...")
+                self.panel.set('settling', "🎯 3 BALLS DETECTED! Auto-advancing to results...", force=True)
                 
                 # Auto-trigger ball scored after settling
                 if not hasattr(self, 'auto_scored') or not self.auto_scored:
@@ -520,32 +829,35 @@ class GameplayScreen(tk.Frame):
                     # Reduce delay for faster progression
                     self.after(1500, self.ball_scored)  # 1.5 seconds for final confirmation
                 else:
-                    print(f"⚠️ Auto-score already triggered, waiting for transition...")
+                    log.info('auto_scored', "⚠️ Auto-score already triggered, waiting for transition...")
 
-            # Draw colorful sector lines and labels
-            self.draw_sectors(frame)
+            if self.display_sink.due():
+                # Colorful sector lines, labels and disc centre from the cached overlay layer
+                stage_start = profiler.begin()
+                self.static_overlay.update(self.overlay_key(), frame.shape)
+                self.static_overlay.apply(frame)
+                profiler.end('overlay', stage_start)
 
-            # Draw enhanced disc center
-            cv2.circle(frame, self.DISC_CENTER, self.VISUAL_CONFIG['center_dot_size'], (255, 255, 255), -1)
-            cv2.circle(frame, self.DISC_CENTER, self.VISUAL_CONFIG['center_dot_size'] + 2, (0, 0, 0), 2)
+                # Scaled to the label and pasted into the persistent Tk image
+                stage_start = profiler.begin()
+                self.display_sink.show(frame)
+                profiler.end('photo', stage_start)
+            else:
+                self.display_sink.skip()
 
-            # Convert BGR back to RGB for proper display (OpenCV draws in BGR, PIL expects RGB)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Display full-size camera frame (no resizing for better quality)
-            img = Image.fromarray(frame_rgb)
-            imgtk = ImageTk.PhotoImage(image=img)
-            self.camera_label.imgtk = imgtk
-            self.camera_label.config(image=imgtk)
+            if profiler.enabled:
+                profiler.end('frame', frame_start)
+                profiler.tick()
+                self.update_perf_readout()
 
-            # Continue camera updates only if camera is still running
+            # Continue camera updates only if camera is still running; the delay keeps the target frame period
             if self.camera_running:
-                self.after(30, self.update_camera)
+                self.camera_update_job = self.after(self.frame_scheduler.end_frame(), self.update_camera)
                 
         except Exception as e:
             print(f"[Camera Update Error] {e}")
             if self.camera_running:
-                self.after(100, self.update_camera)  # Retry after a longer delay
+                self.camera_update_job = self.after(self.frame_scheduler.end_frame(error=True), self.update_camera)
 
     def ball_scored(self):
         # Basic gameplay points
@@ -92,9 +92,8 @@ class WelcomeScreen(tk.Frame):
             self.controller.stop_bgmusic()
         
         # Clean shutdown of MQTT client
-        if hasattr(self.controller, 'mqtt_client') and self.controller.mqtt_client:
-            self.controller.mqtt_client.loop_stop()
-            self.controller.mqtt_client.disconnect()
+        if hasattr(self.controller, 'shutdown_mqtt'):
+            self.controller.shutdown_mqtt()  # Flushes scheduled commands before disconnecting
         
         # Destroy the main window
         self.controller.quit()
@@ -0,0 +1,66 @@
+import time
+
+
+class LabelBinding:
+    """Binds one Tk widget option (text by default) to a value.
+
+    `set()` formats the value and calls `configure()` only when the text
+    differs from what the widget already shows. With `min_interval` > 0 a
+    changed text is applied at most that often (e.g. a countdown); the newest
+    text wins once the interval has passed. `force=True` applies immediately,
+    for state changes that must not lag.
+    """
+
+    def __init__(self, widget, fmt="{}", min_interval=0.0, option="text"):
+        self.widget = widget
+        self.fmt = fmt
+        self.min_interval = min_interval
+        self.option = option
+        self._text = None
+        self._last_update = None
+
+        self.updates = 0
+        self.skipped = 0
+
+    def set(self, value, force=False, now=None):
+        """Show `value`; returns True if the widget was actually reconfigured"""
+        text = self.fmt.format(value)
+        if text == self._text:
+            self.skipped += 1
+            return False
+        if self.min_interval and not force and self._last_update is not None:
+            now = time.monotonic() if now is None else now
+            if now - self._last_update < self.min_interval:
+                self.skipped += 1
+                return False
+        self.widget.configure(**{self.option: text})
+        self._text = text
+        self._last_update = time.monotonic() if now is None else now
+        self.updates += 1
+        return True
+
+    @property
+    def text(self):
+        return self._text
+
+
+class BindingGroup:
+    """Named LabelBindings for one panel, with combined update counters"""
+
+    def __init__(self, **bindings):
+        self._bindings = bindings
+
+    def __getitem__(self, name):
+        return self._bindings[name]
+
+    def __getattr__(self, name):
+        try:
+            return self._bindings[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def set(self, name, value, force=False):
+        return self._bindings[name].set(value, force=force)
+
+    def stats(self):
+        return {name: {'updates': b.updates, 'skipped': b.skipped} for name, b in self._bindings.items()}
@@ -0,0 +1,91 @@
+import queue
+import time
+from vision.stage_profiler import StageProfiler
+
+
+class EventBus:
+    """Hands events from background threads (MQTT) to the Tk thread in batches.
+
+    `post()` may be called from any thread; it only puts the event on a
+    queue.SimpleQueue, which needs no extra locking. One periodic Tk pump,
+    started with `start()`, runs every `interval_ms` and handles all events that
+    were pending when it woke up, so a burst costs one tick rather than one
+    `after()` call per packet. Handlers always run on the Tk thread, so they
+    may touch widgets. The time from `post()` to the handler starting is kept
+    per event type.
+    """
+
+    def __init__(self, root, interval_ms=10, window=300, name="Event Bus"):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.name = name
+        self.latency = StageProfiler(window=window)  # Event type -> post-to-handle ms
+        self._queue = queue.SimpleQueue()
+        self._job = None
+
+        self.posted = 0
+        self.handled = 0
+        self.errors = 0
+        self.ticks = 0
+        self.max_batch = 0
+
+    def post(self, kind, handler, *args):
+        """Queue `handler(*args)` to run on the Tk thread; safe from any thread"""
+        self._queue.put((kind, time.perf_counter(), handler, args))
+        self.posted += 1
+
+    def wrap(self, kind, handler):
+        """Callback that posts its arguments to `handler` instead of calling it on the caller's thread"""
+        def post(*args):
+            self.post(kind, handler, *args)
+        return post
+
+    def start(self):
+        if self._job is None:
+            self._job = self.root.after(self.interval_ms, self._pump)
+
+    def stop(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def pump(self):
+        """Handle every event that is pending right now; returns how many ran"""
+        pending = self._queue.qsize()  # Events arriving meanwhile wait for the next tick
+        for _ in range(pending):
+            try:
+                kind, posted_at, handler, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.latency.record(kind, (time.perf_counter() - posted_at) * 1000)
+            try:
+                handler(*args)
+            except Exception as e:
+                self.errors += 1
+                print(f"[{self.name} Error] {kind} handler failed: {e}")
+            self.handled += 1
+        self.ticks += 1
+        self.max_batch = max(self.max_batch, pending)
+        return pending
+
+    def _pump(self):
+        # Re-arm first so events keep flowing while a handler runs a modal dialog
+        self._job = self.root.after(self.interval_ms, self._pump)
+        self.pump()
+
+    def stats(self):
+        return {
+            'posted': self.posted,
+            'handled': self.handled,
+            'pending': self._queue.qsize(),
+            'errors': self.errors,
+            'max_batch': self.max_batch
+        }
+
+    def dump(self):
+        """Print per-type latency percentiles and the counters"""
+        summary = self.latency.summary()
+        print(f"[{self.name}] {self.stats()}")
+        for kind, s in summary.items():
+            print(f"[{self.name}] {kind:<12} n={s['n']} p50={s['p50']:.1f}ms p95={s['p95']:.1f}ms max={s['max']:.1f}ms")
+        return summary
@@ -0,0 +1,285 @@
+import numpy as np
+import cv2
+from vision.buffer_pool import BufferPool
+from vision.polar_unwrap import PolarUnwrap
+from vision.segmentation import create_engine
+from vision.stage_profiler import DISABLED_PROFILER
+
+
+class BallDetector:
+    """Ball finding pipeline shared by GameplayScreen and the detection worker.
+
+    `detect()` only locates balls; it does not draw anything. It returns a list
+    of ((x, y), radius) tuples in full-frame coordinates, in the same order the
+    gameplay overlay numbers them.
+
+    With `scale` > 1 (2 = half, 4 = quarter resolution) balls are segmented on a
+    downscaled frame first, then each candidate's centre and radius are refined
+    in a small full-resolution window around it.
+
+    The segmentation step (mask -> balls) is a pluggable engine from
+    vision/segmentation.py, selectable at runtime with `set_engine()`.
+
+    `input_scale` is the factor between the frames passed to `detect()` and the
+    calibration (display) resolution, e.g. 2 for a half-size lores stream. The
+    ROI must be given in input coordinates; results are scaled back up.
+
+    Every full-region intermediate (HSV, mask, morphology, downscaled copies) is
+    written into preallocated buffers with dst=, so same-sized frames allocate
+    nothing; `buffer_stats()` reports how often buffers had to be (re)allocated.
+
+    With a profiler from `set_profiler()` the hsv, morphology, segmentation and
+    refine stages are timed separately.
+
+    `set_polar()` switches to polar mode: the disc ROI is remapped into an
+    angle x radius image (vision/polar_unwrap.py) and blobs are found there.
+    Sector indexes then come straight from the blob's column and are left in
+    `last_codes`, parallel to the returned balls (None in Cartesian mode).
+    """
+
+    def __init__(self, lower_ball, upper_ball, scale=1, engine="watershed", input_scale=1):
+        self.lower_ball = np.asarray(lower_ball)
+        self.upper_ball = np.asarray(upper_ball)
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.scale = scale
+        self.input_scale = max(1, int(round(input_scale)))
+        self.engine = create_engine(engine)
+        self.buffers = BufferPool()
+        self._roi_mask_key = None
+        self.profiler = DISABLED_PROFILER
+        self.polar_config = None
+        self.polar_sectors = ()
+        self.polar = None
+        self.last_codes = None
+
+    def set_engine(self, name):
+        """Switch segmentation engine; no-op if it is already active"""
+        if name != self.engine.name:
+            self.engine = create_engine(name)
+            self.engine.profiler = self.profiler
+
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+        self.engine.profiler = profiler
+
+    def set_polar(self, config, sectors=()):
+        """Enable polar mode with {'angle_bins', 'radius_bins', 'inner_radius'} (main-stream px), or None to disable"""
+        self.polar_config = dict(config) if config else None
+        self.polar_sectors = tuple(tuple(s) for s in sectors)
+
+    def set_thresholds(self, lower_ball, upper_ball):
+        self.lower_ball = np.asarray(lower_ball)
+        self.upper_ball = np.asarray(upper_ball)
+
+    def buffer_stats(self):
+        """Scratch buffer (re)allocations in the detector and the active engine"""
+        return {'detector': self.buffers.stats(), 'engine': self.engine.buffers.stats()}
+
+    def _clean_mask(self, mask, iterations):
+        """Open then close the mask in place, using one reused scratch buffer"""
+        scratch = self.buffers.get('morph', mask.shape)
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=scratch, iterations=iterations)
+        cv2.morphologyEx(scratch, cv2.MORPH_CLOSE, self.kernel, dst=mask, iterations=iterations)
+        return mask
+
+    def detect(self, frame, hsv=None, roi=None):
+        """Find balls in the frame using the active segmentation engine.
+
+        `hsv` may be the full frame, already cropped to `roi`, or None to convert here.
+        """
+        self.last_codes = None
+        if self.polar_config is not None and roi is not None:
+            balls = self._detect_polar(frame, roi)
+        elif self.scale > 1:
+            balls = self._detect_coarse_to_fine(frame, roi)
+        else:
+            balls = self._detect_full(frame, hsv, roi)
+        if self.input_scale == 1:
+            return balls
+        s = self.input_scale
+        return [((x * s + s // 2, y * s + s // 2), r * s) for (x, y), r in balls]
+
+    def _detect_full(self, frame, hsv, roi):
+        profiler = self.profiler
+        if hsv is None:
+            start = profiler.begin()
+            region = roi.crop(frame) if roi is not None else frame
+            hsv = cv2.cvtColor(region, cv2.COLOR_RGB2HSV, dst=self.buffers.get('hsv', region.shape))
+            profiler.end('hsv', start)
+
+        # Crop to the disc's bounding box; contours are offset back to full-frame coordinates
+        offset = (0, 0)
+        ws_frame = frame
+        if roi is not None:
+            offset = roi.offset
+            ws_frame = roi.crop(frame)
+            if hsv.shape[:2] == frame.shape[:2]:
+                hsv = roi.crop(hsv)
+
+        # Threshold for ball color
+        start = profiler.begin()
+        mask = cv2.inRange(hsv, self.lower_ball, self.upper_ball, dst=self.buffers.get('mask', hsv.shape[:2]))
+        if roi is not None:
+            # Mask everything outside the disc before any further processing
+            cv2.bitwise_and(mask, roi.mask, dst=mask)
+
+        # Enhanced morphology to clean noise and separate touching balls
+        self._clean_mask(mask, max(1, 2 // self.input_scale))
+        profiler.end('morphology', start)
+
+        balls = self.engine.run(ws_frame, mask, offset, self.input_scale)
+        if profiler.enabled:
+            profiler.record('segmentation', self.engine.last_ms)
+        return balls
+
+    def _detect_coarse_to_fine(self, frame, roi):
+        scale = self.scale
+        total_scale = scale * self.input_scale
+        offset = (0, 0)
+        region = frame
+        if roi is not None:
+            offset = roi.offset
+            region = roi.crop(frame)
+
+        # Segment a downscaled copy of the disc region to find candidate blobs
+        buffers = self.buffers
+        profiler = self.profiler
+        start = profiler.begin()
+        small_size = (max(1, region.shape[1] // scale), max(1, region.shape[0] // scale))
+        small_shape = (small_size[1], small_size[0])
+        small = cv2.resize(region, small_size, dst=buffers.get('small', small_shape + region.shape[2:]),
+                           interpolation=cv2.INTER_AREA)
+        hsv_small = cv2.cvtColor(small, cv2.COLOR_RGB2HSV, dst=buffers.get('small_hsv', small.shape))
+        profiler.end('hsv', start)
+        start = profiler.begin()
+        mask = cv2.inRange(hsv_small, self.lower_ball, self.upper_ball, dst=buffers.get('small_mask', small_shape))
+        if roi is not None:
+            # The downscaled disc mask only changes with the calibration
+            roi_mask = buffers.get('small_roi', small_shape)
+            key = (roi.offset, roi.size, small_size)
+            if key != self._roi_mask_key:
+                cv2.resize(roi.mask, small_size, dst=roi_mask, interpolation=cv2.INTER_NEAREST)
+                self._roi_mask_key = key
+            cv2.bitwise_and(mask, roi_mask, dst=mask)
+
+        # Fewer iterations keep the kernel's reach the same in full-resolution pixels
+        self._clean_mask(mask, max(1, 2 // total_scale))
+        profiler.end('morphology', start)
+
+        candidates = self.engine.run(small, mask, (0, 0), total_scale)
+        if profiler.enabled:
+            profiler.record('segmentation', self.engine.last_ms)
+        # Fallback positions for touching balls are estimates; keep them as-is
+        refine = not self.engine.used_fallback
+
+        start = profiler.begin()
+        balls = []
+        for (sx, sy), small_radius in candidates:
+            center = (offset[0] + sx * scale + scale // 2, offset[1] + sy * scale + scale // 2)
+            radius = small_radius * scale
+            if refine:
+                center, radius = self._refine(frame, center, radius)
+            balls.append((center, radius))
+        profiler.end('refine', start)
+        return balls
+
+    def _polar_map(self, roi):
+        """PolarUnwrap for the ROI's disc in input coordinates, rebuilt only on calibration changes"""
+        config = self.polar_config
+        s = self.input_scale
+        radius_bins = config.get('radius_bins')
+        args = (roi.disc_center, roi.radius, config.get('angle_bins', 360),
+                radius_bins // s if radius_bins else None,
+                config.get('inner_radius', 0) // s, config.get('wrap_degrees', 90), self.polar_sectors)
+        if self.polar is None:
+            self.polar = PolarUnwrap(*args)
+        else:
+            self.polar.update(*args)
+        return self.polar
+
+    def _detect_polar(self, frame, roi):
+        polar = self._polar_map(roi)
+        buffers = self.buffers
+        profiler = self.profiler
+        input_scale = self.input_scale
+
+        start = profiler.begin()
+        unwrapped = polar.unwrap(frame, dst=buffers.get('polar', polar.shape + frame.shape[2:]))
+        hsv = cv2.cvtColor(unwrapped, cv2.COLOR_RGB2HSV, dst=buffers.get('polar_hsv', unwrapped.shape))
+        profiler.end('hsv', start)
+
+        start = profiler.begin()
+        mask = cv2.inRange(hsv, self.lower_ball, self.upper_ball, dst=buffers.get('polar_mask', polar.shape))
+        self._clean_mask(mask, 1)
+        profiler.end('morphology', start)
+
+        start = profiler.begin()
+        labels = buffers.get('polar_labels', polar.shape, np.int32)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, labels, connectivity=8)
+        # A blob touching column 0 is cut at 0 degrees, but whole again in the wrap columns.
+        # Blobs in the wrap columns are skipped when they repeat one found at the start.
+        boxes = [tuple(stats[label][:4]) for label in range(1, count) if stats[label][0] > 0]
+        starts = [(x, y) for x, y, _, _ in boxes if x < polar.angle_bins]
+        balls = []
+        codes = []
+        for x, y, w, h in boxes:
+            if x >= polar.angle_bins and any(abs(x - polar.angle_bins - sx) <= 2 and abs(y - sy) <= 2
+                                             for sx, sy in starts):
+                continue
+            for column, row, radius in self._polar_blob_balls(polar, x, y, w, h):
+                if radius < 8 / input_scale or radius > 100 / input_scale:
+                    continue
+                fx, fy = polar.to_frame(column, row)
+                balls.append(((int(fx), int(fy)), int(radius)))
+                codes.append(polar.code_at_column(column))
+        profiler.end('segmentation', start)
+        self.last_codes = codes
+        return balls
+
+    def _polar_blob_balls(self, polar, x, y, w, h):
+        """(column, row, radius) per ball in a blob's bounding box, splitting side-by-side balls"""
+        row = y + h / 2.0
+        depth = h * polar.px_per_row                      # Radial size in frame px
+        arc = max(polar.arc_length(w, row), 1e-6)         # Angular size in frame px
+        if arc > 1.5 * depth:
+            # Touching balls at the same distance from the centre: equal slices along the angle
+            n = int(round(arc / depth))
+            step = w / float(n)
+            return [(x + step * (i + 0.5), row, arc / n / 2) for i in range(n)]
+        if depth > 1.5 * arc:
+            # Touching balls along a radius: equal slices along the rows
+            n = int(round(depth / arc))
+            step = h / float(n)
+            return [(x + w / 2.0, y + step * (i + 0.5), depth / n / 2) for i in range(n)]
+        return [(x + w / 2.0, row, depth / 2)]
+
+    def _refine(self, frame, center, radius):
+        """Re-measure a coarse candidate inside a small full-resolution window"""
+        scale = self.scale
+        input_scale = self.input_scale
+        reach = int(radius * 1.2) + 2 * scale
+        height, width = frame.shape[:2]
+        x0, y0 = max(0, center[0] - reach), max(0, center[1] - reach)
+        x1, y1 = min(width, center[0] + reach + 1), min(height, center[1] + reach + 1)
+        if x1 <= x0 or y1 <= y0:
+            return center, radius
+
+        hsv = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_RGB2HSV)
+        mask = cv2.inRange(hsv, self.lower_ball, self.upper_ball)
+        iterations = max(1, 2 // input_scale)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, iterations=iterations)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel, iterations=iterations)
+        # Gate to the candidate so a touching neighbour does not pull the circle over
+        gate = np.zeros_like(mask)
+        cv2.circle(gate, (center[0] - x0, center[1] - y0), reach, 255, -1)
+        cv2.bitwise_and(mask, gate, dst=mask)
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(x0, y0))
+        if not contours:
+            return center, radius
+        contour = max(contours, key=cv2.contourArea)
+        (x, y), refined_radius = cv2.minEnclosingCircle(contour)
+        refined_radius = int(refined_radius)
+        if refined_radius < 8 / input_scale or refined_radius > 100 / input_scale:
+            return center, radius
+        return (int(x), int(y)), refined_radius
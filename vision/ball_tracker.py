@@ -0,0 +1,120 @@
+import math
+import time
+
+
+class Track:
+    """One ball followed across frames"""
+
+    def __init__(self, track_id, center):
+        self.id = track_id
+        self.center = center
+        self.velocity = (0.0, 0.0)
+        self.still_frames = 0   # Consecutive frames moved less than the tolerance
+        self.missed = 0         # Consecutive frames without a matching detection
+        self.age = 1
+
+    def predict(self):
+        return (self.center[0] + self.velocity[0], self.center[1] + self.velocity[1])
+
+
+class BallTracker:
+    """Lightweight multi-ball tracker used to decide when the balls have settled.
+
+    Detections are associated to tracks by nearest predicted centroid (greedy,
+    within `match_distance`). A track counts as still while it moves less than
+    `still_tolerance` px per frame. The balls are settled once exactly
+    `expected_count` tracks exist and all of them have been still for
+    `settle_frames` frames. A track may miss up to `max_missed` frames in a row
+    without being dropped or losing its still count.
+    """
+
+    def __init__(self, expected_count=3, match_distance=60, still_tolerance=4,
+                 settle_frames=15, max_missed=5, velocity_smoothing=0.5):
+        self.expected_count = expected_count
+        self.match_distance = match_distance
+        self.still_tolerance = still_tolerance
+        self.settle_frames = settle_frames
+        self.max_missed = max_missed
+        self.velocity_smoothing = velocity_smoothing
+        self.reset()
+
+    def reset(self):
+        self.tracks = []
+        self._next_id = 1
+        self._last_update = None
+        self.frame_interval = None  # Smoothed seconds between updates, for countdown estimates
+
+    def update(self, centers, now=None):
+        """Feed one frame's detected ball centres"""
+        now = time.monotonic() if now is None else now
+        if self._last_update is not None:
+            interval = now - self._last_update
+            if self.frame_interval is None:
+                self.frame_interval = interval
+            else:
+                self.frame_interval = 0.8 * self.frame_interval + 0.2 * interval
+        self._last_update = now
+
+        # Greedy nearest-neighbour association on predicted positions
+        pairs = []
+        for ti, track in enumerate(self.tracks):
+            px, py = track.predict()
+            for di, (x, y) in enumerate(centers):
+                distance = math.hypot(x - px, y - py)
+                if distance <= self.match_distance:
+                    pairs.append((distance, ti, di))
+        pairs.sort()
+
+        matched_tracks, matched_detections = set(), set()
+        for _, ti, di in pairs:
+            if ti in matched_tracks or di in matched_detections:
+                continue
+            matched_tracks.add(ti)
+            matched_detections.add(di)
+            self._advance(self.tracks[ti], centers[di])
+
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+
+        for di, center in enumerate(centers):
+            if di not in matched_detections:
+                self.tracks.append(Track(self._next_id, tuple(center)))
+                self._next_id += 1
+
+    def _advance(self, track, center):
+        dx = center[0] - track.center[0]
+        dy = center[1] - track.center[1]
+        # Velocity is per matched frame; spread movement over any frames the ball was missed
+        steps = track.missed + 1
+        alpha = self.velocity_smoothing
+        track.velocity = (alpha * dx / steps + (1 - alpha) * track.velocity[0],
+                          alpha * dy / steps + (1 - alpha) * track.velocity[1])
+        if math.hypot(dx, dy) / steps <= self.still_tolerance:
+            track.still_frames += 1
+        else:
+            track.still_frames = 0
+        track.center = tuple(center)
+        track.missed = 0
+        track.age += 1
+
+    @property
+    def settled(self):
+        if len(self.tracks) != self.expected_count:
+            return False
+        return all(t.still_frames >= self.settle_frames for t in self.tracks)
+
+    def settle_progress(self):
+        """Frames still needed before the slowest track counts as settled"""
+        if len(self.tracks) != self.expected_count:
+            return self.settle_frames
+        return max(0, self.settle_frames - min(t.still_frames for t in self.tracks))
+
+    def remaining_time(self):
+        """Estimated seconds until settled, based on the measured frame interval"""
+        return self.settle_progress() * (self.frame_interval or 0.0)
+
+    def positions(self):
+        """Current centres of all tracks, oldest track first"""
+        return [t.center for t in sorted(self.tracks, key=lambda t: t.id)]
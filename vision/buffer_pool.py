@@ -0,0 +1,42 @@
+import numpy as np
+
+
+class BufferPool:
+    """Named scratch arrays reused from frame to frame.
+
+    `get()` hands back the same array for a name as long as shape and dtype
+    match, so a steady stream of same-sized frames allocates nothing. A
+    resolution change reallocates that one buffer; `allocations` counts every
+    (re)allocation so tests and benchmarks can check the steady state.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.allocations = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            self._buffers[name] = buf
+            self.allocations += 1
+        return buf
+
+    def peek(self, name):
+        """The current buffer for a name, or None if it was never allocated"""
+        return self._buffers.get(name)
+
+    def clear(self):
+        self._buffers.clear()
+
+    @property
+    def nbytes(self):
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    def stats(self):
+        return {
+            'buffers': len(self._buffers),
+            'allocations': self.allocations,
+            'kb': round(self.nbytes / 1024, 1)
+        }
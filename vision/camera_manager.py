@@ -0,0 +1,153 @@
+import threading
+import time
+from picamera2 import Picamera2
+from vision.frame_grabber import FrameGrabber
+
+
+class CameraManager:
+    """Owns one long-lived Picamera2 and its capture thread across game rounds.
+
+    `acquire()` returns a running FrameGrabber. It opens and configures the
+    camera only the first time (or after an idle close). `release()` only
+    pauses: the capture thread stops, but the sensor keeps streaming, so the
+    next `acquire()` gets a frame within one frame period. If the camera stays
+    released for `stop_after` seconds, streaming stops (the camera stays
+    configured). After `idle_timeout` seconds it is closed completely.
+
+    `warm()` opens and starts the sensor ahead of time without capturing, and
+    holds it there until `acquire()` or `release()`.
+
+    `configure(picam2)` applies the stream configuration to a freshly opened
+    camera and returns the stream names the grabber should capture.
+    """
+
+    CLOSED, STOPPED, PAUSED, STREAMING = "closed", "stopped", "paused", "streaming"
+
+    def __init__(self, configure, stop_after=15.0, idle_timeout=120.0, name="Camera"):
+        self.configure = configure
+        self.stop_after = stop_after
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.picam2 = None
+        self.grabber = None
+        self.state = self.CLOSED
+        self._lock = threading.RLock()
+        self._timer = None
+        self._released_at = None
+
+        self.opens = 0
+        self.starts = 0
+        self.resumes = 0
+
+    def warm(self):
+        """Get the sensor streaming ahead of use; no idle timers run until release()"""
+        with self._lock:
+            self._cancel_timer()
+            start = time.perf_counter()
+            previous = self.state
+            self._start_streaming()
+            if previous != self.state:
+                print(f"[{self.name}] Warmed from {previous} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def acquire(self):
+        """Make sure the camera is streaming and return its FrameGrabber"""
+        with self._lock:
+            self._cancel_timer()
+            start = time.perf_counter()
+            previous = self.state
+            self._start_streaming()
+            if self.state == self.PAUSED:
+                self.grabber.start()
+                self.resumes += 1
+                self.state = self.STREAMING
+            print(f"[{self.name}] Ready from {previous} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return self.grabber
+
+    def _start_streaming(self):
+        """Open/start as needed so the sensor is streaming (state PAUSED or STREAMING)"""
+        if self.state == self.CLOSED:
+            print(f"[{self.name}] Opening camera...")
+            picam2 = Picamera2()
+            try:
+                streams = self.configure(picam2)
+            except Exception:
+                picam2.close()
+                raise
+            self.picam2 = picam2
+            self.grabber = FrameGrabber(self.picam2, name=f"{self.name} Capture", streams=streams)
+            self.opens += 1
+            self.state = self.STOPPED
+        if self.state == self.STOPPED:
+            self.picam2.start()
+            self.starts += 1
+            self.state = self.PAUSED
+
+    def release(self):
+        """Pause capture between rounds; streaming stops and the camera closes later if unused"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.STREAMING:
+                self.grabber.stop()
+                self.state = self.PAUSED
+            self._released_at = time.monotonic()
+            self._schedule(self.stop_after, self._on_idle)
+
+    def close(self):
+        """Stop everything and hand the camera back to the system"""
+        with self._lock:
+            self._cancel_timer()
+            if self.state == self.CLOSED:
+                return
+            try:
+                if self.state == self.STREAMING:
+                    self.grabber.stop()
+                if self.state in (self.STREAMING, self.PAUSED):
+                    self.picam2.stop()
+                self.picam2.close()
+                print(f"[{self.name}] Camera closed")
+            except Exception as e:
+                print(f"[{self.name} Error] Close failed: {e}")
+            self.picam2 = None
+            self.grabber = None
+            self.state = self.CLOSED
+
+    def _on_idle(self):
+        with self._lock:
+            self._timer = None
+            if self._released_at is None or self.state in (self.STREAMING, self.CLOSED):
+                return
+            idle = time.monotonic() - self._released_at
+            if self.state == self.PAUSED:
+                try:
+                    self.picam2.stop()
+                    self.state = self.STOPPED
+                    print(f"[{self.name}] Streaming stopped after {idle:.0f}s idle")
+                except Exception as e:
+                    print(f"[{self.name} Error] Stop failed: {e}")
+                    self.close()
+                    return
+            if idle >= self.idle_timeout:
+                print(f"[{self.name}] Idle for {idle:.0f}s; releasing camera")
+                self.close()
+            else:
+                self._schedule(self.idle_timeout - idle, self._on_idle)
+
+    def _schedule(self, delay, callback):
+        self._cancel_timer()
+        self._timer = threading.Timer(max(0.0, delay), callback)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'opens': self.opens,
+            'starts': self.starts,
+            'resumes': self.resumes
+        }
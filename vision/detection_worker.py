@@ -0,0 +1,244 @@
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from vision.ball_detector import BallDetector
+from vision.disc_roi import DiscROI
+from vision.sector_map import SectorMap
+from vision.stage_profiler import StageProfiler
+
+
+def _build_pipeline(config):
+    detector = BallDetector(config['lower_ball'], config['upper_ball'],
+                            scale=config.get('pyramid_scale', 1),
+                            engine=config.get('segmentation_engine', 'watershed'),
+                            input_scale=config.get('input_scale', 1))
+    if config.get('profile', False):
+        # Only the newest per-stage timings are needed; the UI keeps the history
+        detector.set_profiler(StageProfiler(window=1))
+    if config.get('polar'):
+        detector.set_polar(config['polar'], config['sectors'])
+    roi = None
+    if config.get('roi_radius') is not None:
+        # The ROI lives in detection-frame coordinates, the sector map in display coordinates
+        s = detector.input_scale
+        center = (config['disc_center'][0] // s, config['disc_center'][1] // s)
+        detect_size = config.get('detect_size', config['frame_size'])
+        roi = DiscROI(center, config['roi_radius'] // s, detect_size)
+    sector_map = SectorMap(config['disc_center'], config['sectors'], config['frame_size'],
+                           config.get('disc_radius'))
+    return detector, roi, sector_map
+
+
+def _worker_main(shm_name, frame_shape, slots, config, task_queue, result_queue):
+    """Detection process: reads frames from the shared-memory ring, returns compact results"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    frames = np.ndarray((slots,) + tuple(frame_shape), dtype=np.uint8, buffer=shm.buf)
+    detector, roi, sector_map = _build_pipeline(config)
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            if task[0] == 'config':
+                detector, roi, sector_map = _build_pipeline(task[1])
+                continue
+
+            _, seq, slot = task
+            frame = frames[slot]
+            profiler = detector.profiler
+            profiler.last.clear()
+            start = time.perf_counter()
+            balls = detector.detect(frame, None, roi)
+            detection_ms = (time.perf_counter() - start) * 1000
+            stages = dict(profiler.last) if profiler.enabled else None
+            # (x, y, radius, sector id) per ball - no frame data goes back
+            codes = detector.last_codes
+            if codes is None:
+                codes = [sector_map.code_at(center) for center, _ in balls]
+            result = [(center[0], center[1], radius, code) for (center, radius), code in zip(balls, codes)]
+            result_queue.put((seq, slot, result, detector.engine.last_ms, detection_ms, stages))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        del frames
+        shm.close()
+
+
+class DetectionWorker:
+    """Runs ball detection in a separate process fed through a shared-memory frame ring.
+
+    `config` is a plain dict (lists/tuples only, so it compares cheaply) with
+    lower_ball, upper_ball, disc_center, sectors, frame_size, roi_radius,
+    disc_radius and optionally pyramid_scale, segmentation_engine, and
+    detect_size/input_scale when frames come from a smaller stream than the
+    display (calibration stays in display coordinates), profile to report
+    per-stage timings in `last_stages`, and polar to detect on the unwrapped
+    disc (sector ids then come from the polar columns). The UI copies a frame into a free
+    ring slot with `submit()` and only the slot index goes over the task queue.
+    `poll()` returns the newest result as a list of (x, y, radius, sector_id)
+    tuples and restarts the process if it has died.
+    """
+
+    def __init__(self, frame_shape, config, slots=3, max_restarts=3):
+        self.frame_shape = tuple(frame_shape)
+        self.config = config
+        self.slots = slots
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.failed = False
+
+        self._ctx = mp.get_context("spawn")  # Never fork the Tk process
+        self._shm = None
+        self._frames = None
+        self._process = None
+        self._task_queue = None
+        self._result_queue = None
+        self._busy = set()
+        self._next_slot = 0
+        self._seq = 0
+
+        self.submitted_frames = 0
+        self.skipped_frames = 0
+        self.completed_frames = 0
+        self.segmentation_ms = 0.0  # Engine cost of the newest result, measured in the worker
+        self.detection_ms = 0.0     # Whole detection cost of the newest result
+        self.last_stages = None     # Per-stage ms of the newest result when profiling
+
+    @property
+    def alive(self):
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Allocate the frame ring and launch the worker process"""
+        if self.alive:
+            return
+        try:
+            if self._shm is None:
+                nbytes = self.slots * int(np.prod(self.frame_shape))
+                self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+                self._frames = np.ndarray((self.slots,) + self.frame_shape, dtype=np.uint8,
+                                          buffer=self._shm.buf)
+            self._spawn()
+            print(f"[Detection Worker] Started (pid {self._process.pid}, {self.slots} slots)")
+        except Exception as e:
+            print(f"[Detection Worker Error] Failed to start: {e}")
+            self.failed = True
+
+    def _spawn(self):
+        self._task_queue = self._ctx.Queue()
+        self._result_queue = self._ctx.Queue()
+        self._busy.clear()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.frame_shape, self.slots, self.config,
+                  self._task_queue, self._result_queue),
+            name="DetectionWorker",
+            daemon=True
+        )
+        self._process.start()
+
+    def stop(self, timeout=1.0):
+        """Shut the worker down and release the frame ring"""
+        if self._process is not None:
+            try:
+                self._task_queue.put(None)
+                self._process.join(timeout)
+                if self._process.is_alive():
+                    self._process.terminate()
+                    self._process.join(timeout)
+            except Exception as e:
+                print(f"[Detection Worker Error] Shutdown: {e}")
+            self._process = None
+            print(f"[Detection Worker] Stopped ({self.stats()})")
+        for q in (self._task_queue, self._result_queue):
+            if q is not None:
+                q.cancel_join_thread()
+                q.close()
+        self._task_queue = self._result_queue = None
+        if self._shm is not None:
+            self._frames = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        self._busy.clear()
+
+    def update_config(self, config):
+        """Send new calibration/thresholds to the worker if they changed"""
+        if config == self.config:
+            return
+        self.config = config
+        if self.alive:
+            self._task_queue.put(('config', config))
+
+    def submit(self, frame):
+        """Copy a frame into a free ring slot; returns False if the frame was skipped"""
+        if not self.alive or frame.shape != self.frame_shape:
+            return False
+        for _ in range(self.slots):
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.slots
+            if slot not in self._busy:
+                break
+        else:
+            # Every slot is still being processed; drop this frame
+            self.skipped_frames += 1
+            return False
+
+        np.copyto(self._frames[slot], frame)
+        self._busy.add(slot)
+        self._seq += 1
+        self._task_queue.put(('frame', self._seq, slot))
+        self.submitted_frames += 1
+        return True
+
+    def poll(self):
+        """Return (seq, results) for the newest finished frame, or None if nothing new"""
+        if self._process is not None and not self._process.is_alive():
+            self._restart()
+            return None
+        if self._result_queue is None:
+            return None
+
+        latest = None
+        while True:
+            try:
+                seq, slot, result, segmentation_ms, detection_ms, stages = self._result_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._busy.discard(slot)
+            self.segmentation_ms = segmentation_ms
+            self.detection_ms = detection_ms
+            self.last_stages = stages
+            self.completed_frames += 1
+            if latest is None or seq > latest[0]:
+                latest = (seq, result)
+        return latest
+
+    def _restart(self):
+        exitcode = self._process.exitcode
+        self._process = None
+        if self.restarts >= self.max_restarts:
+            print(f"[Detection Worker Error] Exited with code {exitcode}; restart limit reached")
+            self.failed = True
+            return
+        self.restarts += 1
+        print(f"[Detection Worker] Exited with code {exitcode}; restarting ({self.restarts}/{self.max_restarts})")
+        for q in (self._task_queue, self._result_queue):
+            q.cancel_join_thread()
+            q.close()
+        try:
+            self._spawn()
+        except Exception as e:
+            print(f"[Detection Worker Error] Restart failed: {e}")
+            self.failed = True
+
+    def stats(self):
+        return {
+            'submitted': self.submitted_frames,
+            'completed': self.completed_frames,
+            'skipped': self.skipped_frames,
+            'restarts': self.restarts,
+            'segmentation_ms': round(self.segmentation_ms, 2)
+        }
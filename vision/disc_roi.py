@@ -0,0 +1,51 @@
+import numpy as np
+import cv2
+
+
+class DiscROI:
+    """Circular region of interest around the disc.
+
+    Holds the disc's bounding box (clipped to the frame) and a mask of the same
+    size that is 255 inside the disc and 0 outside. Points found inside the crop
+    map back to full-frame coordinates by adding `offset`.
+    """
+
+    def __init__(self, disc_center, radius, frame_size):
+        self.mask = None
+        self._key = None
+        self.update(disc_center, radius, frame_size)
+
+    def update(self, disc_center, radius, frame_size):
+        """Recompute the bounding box and mask only if the calibration changed"""
+        key = (tuple(disc_center), int(radius), tuple(frame_size))
+        if key == self._key:
+            return False
+        self._key = key
+        (cx, cy), radius, (width, height) = key
+        self.disc_center = (cx, cy)
+        self.radius = radius
+        self.frame_size = (width, height)
+
+        x0, y0 = max(0, cx - radius), max(0, cy - radius)
+        x1, y1 = min(width, cx + radius + 1), min(height, cy + radius + 1)
+        self.offset = (x0, y0)
+        self.size = (x1 - x0, y1 - y0)
+        self.slices = (slice(y0, y1), slice(x0, x1))
+
+        self.mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        cv2.circle(self.mask, (cx - x0, cy - y0), radius, 255, -1)
+        return True
+
+    def crop(self, image):
+        """View of the bounding box (no copy)"""
+        return image[self.slices]
+
+    def to_frame(self, point):
+        """Map an (x, y) point from crop to full-frame coordinates"""
+        return (point[0] + self.offset[0], point[1] + self.offset[1])
+
+    @property
+    def pixel_fraction(self):
+        """Share of the full frame that is still processed"""
+        width, height = self.frame_size
+        return (self.size[0] * self.size[1]) / float(width * height)
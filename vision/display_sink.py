@@ -0,0 +1,92 @@
+import time
+import cv2
+from PIL import Image, ImageTk
+from vision.buffer_pool import BufferPool
+
+
+class DisplaySink:
+    """Shows frames on a Tk label through one persistent PhotoImage.
+
+    Frames are scaled to fit the label, keeping their aspect ratio, before any
+    colour handling. The pixels are then pasted into the existing photo image,
+    so Tk never allocates a new image per frame. The photo is only recreated
+    when the label is resized. `show()` is throttled to `max_fps` on its own
+    clock, independent of how often the caller runs detection. Show deadlines
+    advance by the interval rather than restarting from each shown frame, and
+    half an interval of slack is allowed, so a caller looping at about
+    `max_fps` does not lose every other frame to timer jitter.
+    """
+
+    def __init__(self, label, max_fps=30, fit_to_label=True):
+        self.label = label
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.fit_to_label = fit_to_label
+        self.photo = None
+        self.buffers = BufferPool()
+        self._next_show = None
+
+        self.shown_frames = 0
+        self.throttled_frames = 0
+        self.photo_allocations = 0
+
+    def due(self, now=None):
+        """True if enough time passed since the last displayed frame"""
+        if self._next_show is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now >= self._next_show - self.min_interval / 2
+
+    def skip(self):
+        """Count a frame the caller dropped after checking due(), to save its own work"""
+        self.throttled_frames += 1
+
+    def target_size(self, frame_width, frame_height):
+        """Largest (width, height) with the frame's aspect ratio that fits the label"""
+        if not self.fit_to_label:
+            return frame_width, frame_height
+        label_width, label_height = self.label.winfo_width(), self.label.winfo_height()
+        if label_width <= 1 or label_height <= 1:  # Not laid out yet
+            return frame_width, frame_height
+        scale = min(label_width / frame_width, label_height / frame_height)
+        return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+
+    def show(self, frame, now=None):
+        """Display a BGR frame; returns False if it was skipped by the throttle"""
+        now = time.monotonic() if now is None else now
+        if not self.due(now):
+            self.throttled_frames += 1
+            return False
+        if self._next_show is None or now - self._next_show >= self.min_interval:
+            self._next_show = now + self.min_interval  # First frame, or after a stall: no catch-up burst
+        else:
+            self._next_show += self.min_interval
+
+        height, width = frame.shape[:2]
+        size = self.target_size(width, height)
+        if size != (width, height):
+            # INTER_AREA is only worth its cost for strong reductions; linear is ~6x faster otherwise
+            interpolation = cv2.INTER_AREA if size[0] * 2 <= width else cv2.INTER_LINEAR
+            frame = cv2.resize(frame, size, dst=self.buffers.get('scaled', (size[1], size[0], 3)),
+                               interpolation=interpolation)
+
+        # PIL swaps BGR to RGB while decoding the buffer
+        image = Image.frombuffer("RGB", size, frame, "raw", "BGR", 0, 1)
+        if self.photo is None or (self.photo.width(), self.photo.height()) != size:
+            self.photo = ImageTk.PhotoImage(image=image)
+            self.label.configure(image=self.photo)
+            self.label.imgtk = self.photo  # Keep a reference so Tk does not drop the image
+            self.photo_allocations += 1
+        else:
+            self.photo.paste(image)
+        self.shown_frames += 1
+        return True
+
+    def reset(self):
+        self._next_show = None
+
+    def stats(self):
+        return {
+            'shown': self.shown_frames,
+            'throttled': self.throttled_frames,
+            'photo_allocations': self.photo_allocations
+        }
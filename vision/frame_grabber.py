@@ -0,0 +1,138 @@
+import threading
+import numpy as np
+
+
+class FrameGrabber:
+    """Background capture thread that double-buffers camera frames.
+
+    The thread copies every captured frame into one of two preallocated buffers.
+    `get_latest()` hands the UI the newest complete frame; frames that were
+    overwritten before the UI asked for them are counted as dropped. The buffer
+    returned by `get_latest()` stays untouched by the capture thread until the
+    next `get_latest()` or `release()` call, so the UI may draw on it in place.
+
+    With several `streams` (e.g. ("main", "lores")) every stream is captured from
+    the same request and `get_latest()` returns one array per stream.
+    """
+
+    def __init__(self, picam2, name="FrameGrabber", streams=("main",)):
+        self.picam2 = picam2
+        self.name = name
+        self.streams = list(streams)
+        self._buffers = [None, None]
+        self._ready = None      # Index of the newest complete, undelivered frame
+        self._reading = None    # Index of the buffer currently held by the UI
+        self._last_written = 1
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.captured_frames = 0
+        self.delivered_frames = 0
+        self.dropped_frames = 0
+        self.capture_errors = 0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        print(f"[{self.name}] Capture thread started")
+
+    def stop(self, timeout=1.0):
+        """Stop the capture thread and wait for it to exit"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                print(f"[{self.name}] Capture thread did not stop within {timeout}s")
+            self._thread = None
+        with self._lock:
+            self._ready = None
+            self._reading = None
+        print(f"[{self.name}] Capture thread stopped ({self.stats()})")
+
+    def _shapes_match(self, buffers, arrays):
+        return buffers is not None and all(
+            buf.shape == arr.shape and buf.dtype == arr.dtype for buf, arr in zip(buffers, arrays))
+
+    def _ensure_buffers(self, arrays):
+        for i, buffers in enumerate(self._buffers):
+            if not self._shapes_match(buffers, arrays):
+                self._buffers[i] = [np.empty_like(arr) for arr in arrays]
+
+    def _capture(self):
+        if len(self.streams) == 1:
+            return [self.picam2.capture_array(self.streams[0])]
+        arrays, _ = self.picam2.capture_arrays(self.streams)
+        return arrays
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                arrays = self._capture()
+            except Exception as e:
+                self.capture_errors += 1
+                print(f"[{self.name} Error] {e}")
+                self._stop_event.wait(0.1)
+                continue
+
+            with self._lock:
+                if self._reading is None and self._ready is None:
+                    self._ensure_buffers(arrays)
+                elif not self._shapes_match(self._buffers[0], arrays):
+                    # Resolution changed while the UI holds a buffer; skip until it lets go
+                    continue
+                # Never write into the buffer the UI is holding
+                if self._reading is not None:
+                    index = 1 - self._reading
+                else:
+                    index = 1 - self._last_written
+                if index == self._ready:
+                    # Overwriting a frame the UI never picked up
+                    self._ready = None
+                    self.dropped_frames += 1
+
+            for buf, arr in zip(self._buffers[index], arrays):
+                np.copyto(buf, arr)
+
+            with self._lock:
+                if self._ready is not None:
+                    self.dropped_frames += 1
+                self._ready = index
+                self._last_written = index
+                self.captured_frames += 1
+
+    def get_latest(self):
+        """Return the newest complete frame (a list with one array per stream when
+        capturing several streams), or None if nothing new arrived since the last call"""
+        with self._lock:
+            self._reading = None
+            if self._ready is None:
+                return None
+            index = self._ready
+            self._ready = None
+            self._reading = index
+            self.delivered_frames += 1
+            if len(self.streams) == 1:
+                return self._buffers[index][0]
+            return self._buffers[index]
+
+    def release(self):
+        """Hand the buffer from the last get_latest() back to the capture thread"""
+        with self._lock:
+            self._reading = None
+
+    def stats(self):
+        return {
+            'captured': self.captured_frames,
+            'delivered': self.delivered_frames,
+            'dropped': self.dropped_frames,
+            'errors': self.capture_errors
+        }
@@ -0,0 +1,87 @@
+import math
+import time
+
+
+class FrameScheduler:
+    """Deadline-driven pacing for a Tk `after()` loop.
+
+    Call `begin_frame()` when a frame starts. It returns False when the
+    previous frame blew its budget, meaning this frame should only be
+    displayed and not run detection. At most `max_skip_streak` frames in a row
+    are skipped. `end_frame()` returns the `after()` delay in ms that makes the
+    next frame start one `period_ms` after this one started, however long the
+    work took.
+    """
+
+    def __init__(self, target_fps=30, budget_ratio=0.9, max_skip_streak=2, min_delay_ms=1):
+        self.period_ms = 1000.0 / target_fps
+        self.budget_ms = self.period_ms * budget_ratio  # Work beyond this leaves no room for Tk itself
+        self.max_skip_streak = max_skip_streak
+        self.min_delay_ms = min_delay_ms
+        self.reset()
+
+    def reset(self):
+        self._frame_start = None
+        self._last_start = None
+        self._overrun = False
+        self._skip_streak = 0
+        self.detect_this_frame = True
+        self.interval_ms = None  # Smoothed start-to-start time, for the achieved fps
+        self.last_work_ms = 0.0
+
+        self.frames = 0
+        self.skipped_frames = 0
+        self.overruns = 0
+        self.errors = 0
+
+    def begin_frame(self, now=None):
+        """Start a frame; returns True if detection should run on it"""
+        now = time.monotonic() if now is None else now
+        if self._last_start is not None:
+            interval = (now - self._last_start) * 1000
+            if self.interval_ms is None:
+                self.interval_ms = interval
+            else:
+                self.interval_ms = 0.9 * self.interval_ms + 0.1 * interval
+        self._last_start = self._frame_start = now
+        self.frames += 1
+
+        if self._overrun and self._skip_streak < self.max_skip_streak:
+            self._skip_streak += 1
+            self.skipped_frames += 1
+            self.detect_this_frame = False
+        else:
+            self._skip_streak = 0
+            self.detect_this_frame = True
+        return self.detect_this_frame
+
+    def end_frame(self, now=None, error=False):
+        """Finish the frame and return the delay (ms) until the next one is due"""
+        now = time.monotonic() if now is None else now
+        if error:
+            self.errors += 1
+        if self._frame_start is None:
+            return int(self.period_ms)
+
+        self.last_work_ms = (now - self._frame_start) * 1000
+        self._overrun = self.last_work_ms > self.budget_ms
+        if self._overrun:
+            self.overruns += 1
+        # The deadline follows this frame's start, so a slow frame is not made up with a burst
+        delay = self.period_ms - self.last_work_ms
+        self._frame_start = None
+        return max(self.min_delay_ms, math.ceil(delay))  # after() takes whole ms; never run faster than asked
+
+    @property
+    def fps(self):
+        return 1000.0 / self.interval_ms if self.interval_ms else 0.0
+
+    def stats(self):
+        return {
+            'target_fps': round(1000.0 / self.period_ms, 1),
+            'fps': round(self.fps, 1),
+            'frames': self.frames,
+            'skipped': self.skipped_frames,
+            'overruns': self.overruns,
+            'errors': self.errors
+        }
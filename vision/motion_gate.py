@@ -0,0 +1,97 @@
+import time
+import cv2
+from vision.buffer_pool import BufferPool
+
+
+class MotionGate:
+    """Cheap frame-differencing gate that lets a static disc reuse the last detection.
+
+    Each frame is shrunk by `scale` and turned to grayscale, then compared with
+    the frame the last full detection ran on. If fewer than `min_changed_pixels`
+    pixels inside the disc ROI changed by more than `pixel_threshold`, the frame
+    counts as static. After `max_reuse` static frames in a row, detection is
+    forced once as a safety net.
+    """
+
+    def __init__(self, scale=4, pixel_threshold=15, min_changed_pixels=8, max_reuse=30):
+        self.scale = scale
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_reuse = max_reuse
+        self._reference = None
+        self._current = None
+        self._roi_mask = None
+        self._roi_key = None
+        self._reuse_streak = 0
+        self.buffers = BufferPool()
+
+        self.checked_frames = 0
+        self.static_frames = 0
+        self.gate_ms = 0.0
+        self.detection_ms = None  # Smoothed cost of one full detection
+
+    def reset(self):
+        self._reference = None
+        self._current = None
+        self._reuse_streak = 0
+
+    def _small_gray(self, frame, roi):
+        region = roi.crop(frame) if roi is not None else frame
+        size = (max(1, region.shape[1] // self.scale), max(1, region.shape[0] // self.scale))
+        shape = (size[1], size[0])
+        small = cv2.resize(region, size, dst=self.buffers.get('small', shape + region.shape[2:]),
+                           interpolation=cv2.INTER_AREA)
+        # Two gray buffers take turns so the reference frame is never overwritten
+        name = 'gray_b' if self._reference is self.buffers.peek('gray_a') else 'gray_a'
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY, dst=self.buffers.get(name, shape))
+        if roi is not None and self._roi_key != (roi.offset, roi.size, size):
+            self._roi_key = (roi.offset, roi.size, size)
+            self._roi_mask = cv2.resize(roi.mask, size, interpolation=cv2.INTER_NEAREST)
+        elif roi is None:
+            self._roi_mask = None
+        return gray
+
+    def is_static(self, frame, roi=None):
+        """True if the disc has not changed since the last detection"""
+        start = time.perf_counter()
+        self._current = self._small_gray(frame, roi)
+        static = False
+        if (self._reference is not None and self._reference.shape == self._current.shape
+                and self._reuse_streak < self.max_reuse):
+            diff = cv2.absdiff(self._current, self._reference,
+                               dst=self.buffers.get('diff', self._current.shape))
+            _, changed = cv2.threshold(diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=diff)
+            if self._roi_mask is not None:
+                cv2.bitwise_and(changed, self._roi_mask, dst=changed)
+            static = cv2.countNonZero(changed) < self.min_changed_pixels
+
+        self.checked_frames += 1
+        if static:
+            self.static_frames += 1
+            self._reuse_streak += 1
+        self.gate_ms += (time.perf_counter() - start) * 1000
+        return static
+
+    def mark_detected(self, detection_ms=None):
+        """The last checked frame went through full detection; make it the new reference"""
+        self._reference = self._current
+        self._reuse_streak = 0
+        if detection_ms is not None:
+            if self.detection_ms is None:
+                self.detection_ms = detection_ms
+            else:
+                self.detection_ms = 0.9 * self.detection_ms + 0.1 * detection_ms
+
+    @property
+    def hit_rate(self):
+        return self.static_frames / self.checked_frames if self.checked_frames else 0.0
+
+    def stats(self):
+        saved_ms = self.static_frames * (self.detection_ms or 0.0) - self.gate_ms
+        return {
+            'checked': self.checked_frames,
+            'reused': self.static_frames,
+            'hit_rate': round(self.hit_rate, 3),
+            'gate_ms': round(self.gate_ms, 1),
+            'saved_ms': round(saved_ms, 1)
+        }
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+import cv2
+from vision.sector_map import UNKNOWN_SECTOR
+
+
+class PolarUnwrap:
+    """Precomputed cv2.remap maps that unwrap the disc into an angle x radius image.
+
+    Row i samples radius `inner_radius + (i + 0.5) * px_per_row` and column j
+    samples angle `(j + 0.5) * deg_per_col` (degrees counter-clockwise, like the
+    sector table). Past 360 degrees the image keeps going for `wrap_degrees`, so
+    a ball lying across 0 degrees shows up once in one piece. `column_codes`
+    gives every column's sector index, so a sector is just a column range.
+    The maps are only rebuilt when the calibration or bin counts change.
+    """
+
+    def __init__(self, disc_center, radius, angle_bins=360, radius_bins=None,
+                 inner_radius=0, wrap_degrees=90, sectors=()):
+        self.map_x = None
+        self.map_y = None
+        self._key = None
+        self.update(disc_center, radius, angle_bins, radius_bins, inner_radius, wrap_degrees, sectors)
+
+    def update(self, disc_center, radius, angle_bins=360, radius_bins=None,
+               inner_radius=0, wrap_degrees=90, sectors=()):
+        """Rebuild the maps only if the calibration changed"""
+        if radius_bins is None:
+            radius_bins = max(1, (int(radius) - int(inner_radius)) // 2)
+        key = (tuple(disc_center), int(radius), int(angle_bins), int(radius_bins),
+               int(inner_radius), int(wrap_degrees), tuple(tuple(s) for s in sectors))
+        if key == self._key:
+            return False
+        self._key = key
+        (cx, cy), radius, angle_bins, radius_bins, inner_radius, wrap_degrees, sectors = key
+        self.disc_center = (cx, cy)
+        self.radius = radius
+        self.inner_radius = inner_radius
+        self.angle_bins = angle_bins
+        self.radius_bins = radius_bins
+        self.deg_per_col = 360.0 / angle_bins
+        self.px_per_row = (radius - inner_radius) / float(radius_bins)
+        self.wrap_cols = int(math.ceil(wrap_degrees / self.deg_per_col))
+        self.shape = (radius_bins, angle_bins + self.wrap_cols)
+
+        angles = np.radians((np.arange(self.shape[1]) + 0.5) * self.deg_per_col)
+        radii = inner_radius + (np.arange(radius_bins) + 0.5) * self.px_per_row
+        self.map_x = (cx + radii[:, np.newaxis] * np.cos(angles)).astype(np.float32)
+        self.map_y = (cy - radii[:, np.newaxis] * np.sin(angles)).astype(np.float32)  # Y inverted in image coords
+
+        # First matching sector wins, like SectorMap and get_sector_label
+        column_angles = ((np.arange(self.shape[1]) + 0.5) * self.deg_per_col) % 360
+        self.names = [label for label, _, _ in sectors]
+        self.column_codes = np.full(self.shape[1], UNKNOWN_SECTOR, dtype=np.uint8)
+        for index in range(len(sectors) - 1, -1, -1):
+            _, start, end = sectors[index]
+            self.column_codes[(start <= column_angles) & (column_angles < end)] = index
+        return True
+
+    def unwrap(self, image, dst=None):
+        """Sample the disc into a (radius_bins, angle_bins + wrap_cols) image"""
+        return cv2.remap(image, self.map_x, self.map_y, cv2.INTER_LINEAR, dst=dst,
+                         borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+    def to_frame(self, column, row):
+        """Map a (possibly fractional) polar position back to (x, y) frame coordinates"""
+        angle = math.radians(column * self.deg_per_col)
+        radius = self.inner_radius + row * self.px_per_row
+        return (self.disc_center[0] + radius * math.cos(angle),
+                self.disc_center[1] - radius * math.sin(angle))
+
+    def code_at_column(self, column):
+        """Sector index for a polar column (UNKNOWN_SECTOR in gaps)"""
+        return int(self.column_codes[int(column) % self.shape[1]])
+
+    def arc_length(self, columns, row):
+        """Frame-pixel length of `columns` columns at polar row `row`"""
+        radius = self.inner_radius + row * self.px_per_row
+        return math.radians(columns * self.deg_per_col) * radius
+
+    @property
+    def pixel_fraction(self):
+        """Polar image size relative to the disc's bounding box"""
+        side = 2 * self.radius + 1
+        return (self.shape[0] * self.shape[1]) / float(side * side)
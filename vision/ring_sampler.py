@@ -0,0 +1,83 @@
+import numpy as np
+
+
+class RingSampler:
+    """Average colour of the annulus around each ball, without full-frame masks.
+
+    The (dy, dx) offsets of every pixel with inner_r < distance <= outer_r are
+    computed once per radius pair and cached. Sampling adds them to each ball
+    centre, drops the ones that fall off the image, and reads all balls' rings
+    with one fancy-index gather. `classify()` then checks every ring average
+    against a table of HSV ranges in one batch; the first matching name wins,
+    like walking the table in order.
+    """
+
+    def __init__(self, regions=None):
+        self._offsets = {}  # (inner_r, outer_r) -> (dy, dx) int arrays
+        self.set_regions(regions or {})
+
+    def set_regions(self, regions):
+        """{name: (lower, upper)} HSV ranges, checked in insertion order"""
+        self.names = list(regions)
+        if regions:
+            self.lower = np.array([low for low, _ in regions.values()], dtype=np.int16)
+            self.upper = np.array([up for _, up in regions.values()], dtype=np.int16)
+        else:
+            self.lower = self.upper = np.zeros((0, 3), dtype=np.int16)
+
+    def offsets(self, inner_r, outer_r):
+        """Cached (dy, dx) of the annulus between the two radii"""
+        key = (int(inner_r), int(outer_r))
+        cached = self._offsets.get(key)
+        if cached is None:
+            inner_r, outer_r = key
+            span = np.arange(-outer_r, outer_r + 1)
+            dy, dx = np.meshgrid(span, span, indexing="ij")
+            d2 = dy * dy + dx * dx
+            ring = (d2 <= outer_r * outer_r) & (d2 > inner_r * inner_r)
+            cached = self._offsets[key] = (dy[ring], dx[ring])
+        return cached
+
+    def sample(self, image, rings):
+        """Mean pixel per ring as an (N, channels) uint8 array.
+
+        `rings` is a list of ((x, y), inner_r, outer_r). A ring that is entirely
+        off the image averages to zeros.
+        """
+        channels = image.shape[2] if image.ndim == 3 else 1
+        result = np.zeros((len(rings), channels), dtype=np.uint8)
+        if not rings:
+            return result
+        height, width = image.shape[:2]
+        ys, xs, counts = [], [], []
+        for (cx, cy), inner_r, outer_r in rings:
+            dy, dx = self.offsets(inner_r, outer_r)
+            y = dy + int(cy)
+            x = dx + int(cx)
+            inside = (y >= 0) & (y < height) & (x >= 0) & (x < width)
+            ys.append(y[inside])
+            xs.append(x[inside])
+            counts.append(ys[-1].size)
+
+        counts = np.array(counts)
+        values = image[np.concatenate(ys), np.concatenate(xs)].reshape(-1, channels)
+        filled = counts > 0
+        if values.size:
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+            sums = np.add.reduceat(values.astype(np.uint32), starts, axis=0)
+            result[filled] = (sums / counts[filled, np.newaxis]).astype(np.uint8)
+        return result
+
+    def classify(self, colours, default="None"):
+        """Region name for each row of an (N, 3) colour array"""
+        colours = np.asarray(colours, dtype=np.int16).reshape(-1, 1, 3)
+        if not len(self.names) or not len(colours):
+            return [default] * len(colours)
+        matches = np.all((colours >= self.lower) & (colours <= self.upper), axis=2)  # (N, regions)
+        first = matches.argmax(axis=1)
+        return [self.names[i] if matches[n, i] else default for n, i in enumerate(first)]
+
+    def classify_rings(self, image, rings, default="None"):
+        """Sample and classify in one call; returns (names, averages)"""
+        averages = self.sample(image, rings)
+        return self.classify(averages, default), averages
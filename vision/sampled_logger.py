@@ -0,0 +1,51 @@
+import logging
+import sys
+
+
+class SampledLogger:
+    """Level-filtered logging for messages that would otherwise print every frame.
+
+    Each message `key` is emitted at most once every `every` calls, and only
+    if the logger's level lets it through. Filtered calls return before any
+    formatting happens (arguments use logging's lazy %-style). Output goes to
+    stdout as "[name] message", like the rest of the app's prints.
+    """
+
+    def __init__(self, name, level="INFO", every=30):
+        self.logger = logging.getLogger(name)
+        if not self.logger.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+            self.logger.addHandler(handler)
+            self.logger.propagate = False
+        self.logger.setLevel(level)
+        self.every = max(1, every)
+        self._counts = {}
+        self.suppressed = 0
+
+    def set_level(self, level):
+        self.logger.setLevel(level)
+
+    def _sample(self, key):
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every:
+            self.suppressed += 1
+            return False
+        return True
+
+    def debug(self, key, msg, *args):
+        if self.logger.isEnabledFor(logging.DEBUG) and self._sample(key):
+            self.logger.debug(msg, *args)
+
+    def info(self, key, msg, *args):
+        if self.logger.isEnabledFor(logging.INFO) and self._sample(key):
+            self.logger.info(msg, *args)
+
+    def warning(self, key, msg, *args):
+        if self.logger.isEnabledFor(logging.WARNING) and self._sample(key):
+            self.logger.warning(msg, *args)
+
+    def reset(self):
+        """Start sampling afresh so the first message of each key shows again"""
+        self._counts.clear()
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+
+# Codes used in the label image besides the sector indexes
+UNKNOWN_SECTOR = 254   # Inside the disc but in a gap between sector angle ranges
+OUTSIDE_DISC = 255     # Outside the disc radius
+
+
+class SectorMap:
+    """Per-pixel sector index built once from the disc centre and sector angle table.
+
+    labels[y, x] holds the index into `sectors` for that pixel, UNKNOWN_SECTOR for
+    angles that fall between sectors, or OUTSIDE_DISC beyond `disc_radius`.
+    The map rebuilds itself whenever the centre, angle table, frame size or radius change.
+    """
+
+    def __init__(self, disc_center, sectors, frame_size, disc_radius=None):
+        self.labels = None
+        self.names = []
+        self._key = None
+        self.update(disc_center, sectors, frame_size, disc_radius)
+
+    def update(self, disc_center, sectors, frame_size, disc_radius=None):
+        """Rebuild the label image only if the calibration changed"""
+        key = (tuple(disc_center), [tuple(s) for s in sectors], tuple(frame_size), disc_radius)
+        if key == self._key:
+            return False
+        self._key = key
+        self.disc_center = key[0]
+        self.sectors = key[1]
+        self.frame_size = key[2]
+        self.disc_radius = disc_radius
+        self.names = [label for label, _, _ in self.sectors]
+        self.labels = self._build()
+        return True
+
+    def _build(self):
+        width, height = self.frame_size
+        cx, cy = self.disc_center
+        dx = np.arange(width, dtype=np.float64)[np.newaxis, :] - cx
+        dy = cy - np.arange(height, dtype=np.float64)[:, np.newaxis]  # Y inverted in image coords
+
+        angle = np.degrees(np.arctan2(dy, dx))
+        angle = (angle + 360) % 360  # normalize to [0, 360)
+
+        labels = np.full((height, width), UNKNOWN_SECTOR, dtype=np.uint8)
+        # Walk the table in reverse so the first matching sector wins, like get_sector_label
+        for index in range(len(self.sectors) - 1, -1, -1):
+            _, start, end = self.sectors[index]
+            labels[(start <= angle) & (angle < end)] = index
+
+        if self.disc_radius is not None:
+            labels[dx * dx + dy * dy > self.disc_radius * self.disc_radius] = OUTSIDE_DISC
+        return labels
+
+    def code_at(self, point):
+        """Label code for a single (x, y) point"""
+        x, y = int(point[0]), int(point[1])
+        height, width = self.labels.shape
+        if 0 <= x < width and 0 <= y < height:
+            return int(self.labels[y, x])
+        return self._code_from_angle(x, y)
+
+    def _code_from_angle(self, x, y):
+        # Points off the frame (e.g. fallback offsets) are not in the map
+        dx = x - self.disc_center[0]
+        dy = self.disc_center[1] - y
+        if self.disc_radius is not None and dx * dx + dy * dy > self.disc_radius * self.disc_radius:
+            return OUTSIDE_DISC
+        angle = (math.degrees(math.atan2(dy, dx)) + 360) % 360
+        for index, (_, start, end) in enumerate(self.sectors):
+            if start <= angle < end:
+                return index
+        return UNKNOWN_SECTOR
+
+    def label_at(self, point, default="Unknown"):
+        """Sector name for a single (x, y) point"""
+        code = self.code_at(point)
+        if code < len(self.names):
+            return self.names[code]
+        return default
+
+    def classify_points(self, points):
+        """Label codes for an (N, 2) array of (x, y) points in one gather"""
+        points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        height, width = self.labels.shape
+        xs, ys = points[:, 0], points[:, 1]
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        codes = np.empty(len(points), dtype=np.uint8)
+        codes[inside] = self.labels[ys[inside], xs[inside]]
+        for i in np.flatnonzero(~inside):
+            codes[i] = self._code_from_angle(xs[i], ys[i])
+        return codes
+
+    def classify_mask(self, mask):
+        """Pixel count per sector for a full-frame mask, in one vectorized pass"""
+        counts = np.bincount(self.labels[mask > 0], minlength=256)
+        return {name: int(counts[i]) for i, name in enumerate(self.names)}
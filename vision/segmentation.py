@@ -0,0 +1,237 @@
+import time
+from abc import ABC, abstractmethod
+import numpy as np
+import cv2
+from vision.buffer_pool import BufferPool
+from vision.stage_profiler import DISABLED_PROFILER
+
+
+class SegmentationEngine(ABC):
+    """Turns a cleaned ball mask into ((x, y), radius) balls.
+
+    `segment()` works in the mask's own coordinates plus `offset`, with area and
+    radius limits divided by `scale` for downscaled masks. `used_fallback` tells
+    the caller the positions are estimates rather than measured blobs.
+    Per-frame cost is kept in last_ms/average_ms. Full-mask scratch arrays live
+    in `buffers` and are reused while the mask size stays the same.
+    """
+    name = "base"
+
+    def __init__(self):
+        self.kernel = np.ones((3, 3), np.uint8)
+        self.buffers = BufferPool()
+        self.profiler = DISABLED_PROFILER
+        self.used_fallback = False
+        self.frames = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+
+    @abstractmethod
+    def segment(self, ws_frame, mask, offset=(0, 0), scale=1):
+        """List of ((x, y), radius) balls found in `mask`"""
+
+    def run(self, ws_frame, mask, offset=(0, 0), scale=1):
+        """Segment and record how long it took"""
+        start = time.perf_counter()
+        balls = self.segment(ws_frame, mask, offset, scale)
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.total_ms += self.last_ms
+        self.frames += 1
+        return balls
+
+    @property
+    def average_ms(self):
+        return self.total_ms / self.frames if self.frames else 0.0
+
+    def stats(self):
+        return {
+            'engine': self.name,
+            'frames': self.frames,
+            'last_ms': round(self.last_ms, 2),
+            'average_ms': round(self.average_ms, 2)
+        }
+
+
+class WatershedEngine(SegmentationEngine):
+    """Original pipeline: distance transform + watershed, contour heuristic when fewer than 2 balls"""
+    name = "watershed"
+
+    def segment(self, ws_frame, mask, offset=(0, 0), scale=1):
+        self.used_fallback = False
+        balls = self._watershed_balls(ws_frame, mask, offset, scale)
+
+        # Fallback: if watershed didn't find enough balls, try contour-based detection
+        if len(balls) < 2:
+            self.used_fallback = True
+            start = self.profiler.begin()
+            balls = self._contour_balls(mask, offset, scale)
+            self.profiler.end('fallback', start)
+        return balls
+
+    def _watershed_balls(self, ws_frame, mask, offset, scale=1):
+        buffers = self.buffers
+        shape = mask.shape[:2]
+
+        # Use distance transform and watershed to separate touching balls
+        dist_transform = cv2.distanceTransform(mask, cv2.DIST_L2, 5,
+                                               dst=buffers.get('dist', shape, np.float32))
+
+        # Find local maxima (ball centers); same as threshold(dist, 0.4 * max, 255) cast to uint8
+        sure_fg = cv2.compare(dist_transform, 0.4 * float(dist_transform.max()), cv2.CMP_GT,
+                              dst=buffers.get('sure_fg', shape))
+
+        # Find sure background area
+        sure_bg = cv2.dilate(mask, self.kernel, dst=buffers.get('sure_bg', shape),
+                             iterations=max(1, 3 // scale))
+        unknown = cv2.subtract(sure_bg, sure_fg, dst=buffers.get('unknown', shape))
+
+        # Marker labelling
+        _, markers = cv2.connectedComponents(sure_fg, buffers.get('markers', shape, np.int32))
+        markers += 1
+        is_unknown = np.equal(unknown, 255, out=buffers.get('is_unknown', shape, np.bool_))
+        np.copyto(markers, 0, where=is_unknown)
+
+        # Apply watershed (it only writes the markers; the frame needs no copy)
+        markers = cv2.watershed(ws_frame, markers)
+
+        balls = []
+        ball_select = buffers.get('ball_select', shape, np.bool_)
+        # Process each detected region
+        for marker_id in range(2, markers.max() + 1):
+            # Create mask for this specific ball (a uint8 view of the reused boolean buffer)
+            ball_mask = np.equal(markers, marker_id, out=ball_select).view(np.uint8)
+
+            # Calculate area to filter out noise
+            area = cv2.countNonZero(ball_mask)
+            if area < 300 / scale ** 2:  # Minimum area for a ball (reduced from 500)
+                continue
+
+            # Find contour for this ball
+            contours, _ = cv2.findContours(ball_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+            if not contours:
+                continue
+
+            contour = max(contours, key=cv2.contourArea)
+            (x, y), radius = cv2.minEnclosingCircle(contour)
+            center = (int(x), int(y))
+            radius = int(radius)
+
+            # Additional validation: check if radius is reasonable for a ball
+            if radius < 8 / scale or radius > 100 / scale:  # Adjust these values based on your ball size
+                continue
+
+            balls.append((center, radius))
+        return balls
+
+    def _contour_balls(self, mask, offset, scale=1):
+        balls = []
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset)
+        if not contours:
+            return balls
+
+        # Sort contours by area (largest first)
+        contours = sorted(contours, key=cv2.contourArea, reverse=True)
+
+        for contour in contours:
+            if cv2.contourArea(contour) <= 300 / scale ** 2:  # ignore small noise
+                continue
+
+            # Check if this is likely multiple balls by analyzing the contour
+            hull = cv2.convexHull(contour)
+            hull_area = cv2.contourArea(hull)
+            contour_area = cv2.contourArea(contour)
+            solidity = float(contour_area) / hull_area
+
+            (x, y), radius = cv2.minEnclosingCircle(contour)
+            center = (int(x), int(y))
+            radius = int(radius)
+
+            # If solidity is low, might be multiple touching balls
+            if solidity < 0.7 and radius > 25 / scale:
+                # Try to estimate number of balls based on area
+                estimated_ball_area = np.pi * (radius / 1.5) ** 2
+                num_balls = max(1, int(contour_area / estimated_ball_area))
+
+                # Create multiple detection points for touching balls
+                moments = cv2.moments(contour)
+                if moments['m00'] != 0:
+                    cx = int(moments['m10'] / moments['m00'])
+                    cy = int(moments['m01'] / moments['m00'])
+
+                    for i in range(min(num_balls, 3)):  # Max 3 balls
+                        offset_x = (i - 1) * radius // 2
+                        balls.append(((cx + offset_x, cy), radius))
+            else:
+                # Single ball
+                balls.append((center, radius))
+        return balls
+
+
+class ComponentsEngine(SegmentationEngine):
+    """connectedComponentsWithStats plus distance-transform peak splitting.
+
+    Each blob is handled inside its own bounding box, so no full-frame mask is
+    ever built per blob. A blob whose distance transform has several separate
+    peaks is split into one ball per peak.
+    """
+    name = "components"
+
+    def __init__(self, peak_ratio=0.5):
+        super().__init__()
+        self.peak_ratio = peak_ratio  # Fraction of a blob's max distance that counts as a ball core
+
+    def segment(self, ws_frame, mask, offset=(0, 0), scale=1):
+        self.used_fallback = False
+        balls = []
+        labels = self.buffers.get('labels', mask.shape[:2], np.int32)
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, labels, connectivity=8)
+        min_area = 300 / scale ** 2
+        for label in range(1, count):
+            x, y, w, h, area = stats[label]
+            if area < min_area:
+                continue
+
+            # Blob mask limited to its bounding box, padded so the border counts as background
+            blob = np.uint8(labels[y:y + h, x:x + w] == label)
+            blob = cv2.copyMakeBorder(blob, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+            dist = cv2.distanceTransform(blob, cv2.DIST_L2, 5)
+            peak_mask = np.uint8(dist >= self.peak_ratio * dist.max())
+            peaks, peak_labels, peak_stats, peak_centroids = cv2.connectedComponentsWithStats(peak_mask)
+
+            origin = (offset[0] + x - 1, offset[1] + y - 1)
+            if peaks <= 2:
+                # Single core: measure the whole blob like the watershed path does
+                contours, _ = cv2.findContours(blob, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=origin)
+                if not contours:
+                    continue
+                (cx, cy), radius = cv2.minEnclosingCircle(max(contours, key=cv2.contourArea))
+                candidates = [((int(cx), int(cy)), int(radius))]
+            else:
+                # Touching balls: one ball per distance peak, radius = distance to the blob edge
+                candidates = []
+                for peak in range(1, peaks):
+                    px, py, pw, ph, _ = peak_stats[peak]
+                    core = dist[py:py + ph, px:px + pw] * (peak_labels[py:py + ph, px:px + pw] == peak)
+                    cx, cy = peak_centroids[peak]
+                    center = (int(origin[0] + cx), int(origin[1] + cy))
+                    candidates.append((center, int(core.max())))
+
+            for center, radius in candidates:
+                if radius < 8 / scale or radius > 100 / scale:
+                    continue
+                balls.append((center, radius))
+        return balls
+
+
+SEGMENTATION_ENGINES = {
+    WatershedEngine.name: WatershedEngine,
+    ComponentsEngine.name: ComponentsEngine
+}
+
+
+def create_engine(name):
+    """Instantiate a segmentation engine by name"""
+    try:
+        return SEGMENTATION_ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown segmentation engine '{name}' (choose from {', '.join(SEGMENTATION_ENGINES)})")
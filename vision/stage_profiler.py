@@ -0,0 +1,104 @@
+import time
+import numpy as np
+
+
+class StageProfiler:
+    """Per-stage timings kept in fixed-size ring buffers.
+
+    Wrap a stage with `start = profiler.begin()` ... `profiler.end('stage', start)`.
+    When disabled `begin()` returns None and `end()` returns straight away, so
+    instrumented code costs one attribute check per stage. Percentiles are only
+    computed when `summary()`, `readout()` or `dump()` is called.
+    """
+
+    def __init__(self, window=300, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._rings = {}     # stage -> float64 ring of the last `window` durations (ms)
+        self._counts = {}    # stage -> samples recorded so far
+        self.last = {}       # stage -> most recent duration (ms)
+        self._last_frame = None
+
+    def begin(self):
+        return time.perf_counter() if self.enabled else None
+
+    def end(self, stage, start):
+        """Record the time since `start` (from `begin()`) under `stage`"""
+        if start is None:
+            return
+        self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record(self, stage, ms):
+        """Add an already measured duration, e.g. one reported by the detection worker"""
+        ring = self._rings.get(stage)
+        if ring is None:
+            ring = self._rings[stage] = np.zeros(self.window)
+            self._counts[stage] = 0
+        ring[self._counts[stage] % self.window] = ms
+        self._counts[stage] += 1
+        self.last[stage] = ms
+
+    def tick(self):
+        """Mark the end of one displayed frame; the interval feeds the 'interval' stage (fps)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.record('interval', (now - self._last_frame) * 1000)
+        self._last_frame = now
+
+    def reset(self):
+        self._rings.clear()
+        self._counts.clear()
+        self.last.clear()
+        self._last_frame = None
+
+    def samples(self, stage):
+        ring = self._rings.get(stage)
+        if ring is None:
+            return None
+        return ring[:min(self._counts[stage], self.window)]
+
+    def summary(self):
+        """{stage: {'n', 'p50', 'p95', 'p99', 'max'}} over the current window, in ms"""
+        result = {}
+        for stage in self._rings:
+            values = self.samples(stage)
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[stage] = {
+                'n': self._counts[stage],
+                'p50': round(float(p50), 2),
+                'p95': round(float(p95), 2),
+                'p99': round(float(p99), 2),
+                'max': round(float(values.max()), 2)
+            }
+        return result
+
+    @property
+    def fps(self):
+        values = self.samples('interval')
+        if values is None or not len(values):
+            return 0.0
+        return 1000.0 / float(np.median(values))
+
+    def readout(self, stages=('frame', 'detect')):
+        """Compact multi-line text for an on-screen label"""
+        lines = [f"FPS {self.fps:.1f}"]
+        summary = self.summary()
+        for stage in stages:
+            if stage in summary:
+                lines.append(f"{stage} {summary[stage]['p50']:.0f}/{summary[stage]['p95']:.0f}ms")
+        return "\n".join(lines)
+
+    def dump(self, title="Stage Profiler"):
+        """Print a p50/p95/p99 table of every stage"""
+        summary = self.summary()
+        print(f"[{title}] {self.fps:.1f} fps over the last {self.window} frames")
+        print(f"[{title}] {'stage':<14}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+        for stage, s in summary.items():
+            print(f"[{title}] {stage:<14}{s['n']:>7}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}")
+        return summary
+
+
+# Shared disabled instance for components that were not given a profiler
+DISABLED_PROFILER = StageProfiler(window=1, enabled=False)
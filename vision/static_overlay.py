@@ -0,0 +1,49 @@
+import numpy as np
+import cv2
+
+
+class StaticOverlay:
+    """Pre-rendered drawing layer for overlays that only change with calibration.
+
+    `render(canvas)` draws the overlay with ordinary OpenCV calls. It runs once
+    per `key` (e.g. frame shape + calibration) onto two canvases, one black and
+    one white. Pixels that come out identical on both are the drawn ones, so
+    black strokes get into the mask too. `apply()` then masked-copies only the
+    overlay's bounding box onto each frame.
+    """
+
+    def __init__(self, render):
+        self.render = render
+        self._key = None
+        self.image = None
+        self.mask = None
+        self.rect = None    # (x, y, w, h) of the drawn pixels
+        self.renders = 0
+
+    def update(self, key, shape):
+        """Re-render if the key or the frame shape changed; returns True if it did"""
+        key = (tuple(shape), key)
+        if key == self._key:
+            return False
+        self._key = key
+
+        dark = np.zeros(shape, np.uint8)
+        light = np.full(shape, 255, np.uint8)
+        self.render(dark)
+        self.render(light)
+        drawn = np.all(dark == light, axis=2).astype(np.uint8) * 255
+
+        x, y, w, h = cv2.boundingRect(drawn)
+        self.rect = (x, y, w, h)
+        self.image = dark[y:y + h, x:x + w].copy()
+        self.mask = drawn[y:y + h, x:x + w].copy()
+        self.renders += 1
+        return True
+
+    def apply(self, frame):
+        """Copy the overlay onto the frame in place"""
+        if self.image is None or not self.rect[2] or not self.rect[3]:
+            return frame
+        x, y, w, h = self.rect
+        cv2.copyTo(self.image, self.mask, frame[y:y + h, x:x + w])
+        return frame